@@ -12,7 +12,7 @@ from pm4py.objects.petri_net.exporter.variants.pnml import export_petri_as_strin
 from pm4py.util import constants
 from pm4py.visualization.bpmn import visualizer as bpmn_visualizer
 from pm4py.visualization.petri_net import visualizer as pn_visualizer
-from powl import convert_to_bpmn, import_event_log
+from powl import convert_to_bpmn
 from powl.conversion.variants.to_petri_net import apply as convert_to_petri_net
 from promoai.general_utils.ai_providers import (
     AI_HELP_DEFAULTS,
@@ -22,17 +22,38 @@ from promoai.general_utils.ai_providers import (
 )
 from promoai.general_utils.app_utils import DISCOVERY_HELP, InputType, ViewType
 
+# the discovery cache keeps data derived from the uploaded logs on disk, so it is only used if a
+# directory is configured; entries are dropped after a day and beyond 100 logs
+DISCOVERY_CACHE_DIR = os.environ.get("PROMOAI_DISCOVERY_CACHE_DIR")
+DISCOVERY_CACHE_MAX_ENTRIES = 100
+DISCOVERY_CACHE_TTL_S = 24 * 3600
+
 
 def run_model_generator_app():
     subprocess.run(["streamlit", "run", __file__])
 
 
+def _show_partial_response(placeholder):
+    # shows the response of the LLM while it is streamed
+    def on_partial_response(response):
+        placeholder.markdown(response)
+
+    return on_partial_response
+
+
 def run_app():
     st.title("🤖 ProMoAI")
 
     st.subheader("Process Modeling with Generative AI")
 
     temp_dir = "temp"
+    discovery_cache = None
+    if DISCOVERY_CACHE_DIR:
+        discovery_cache = promoai.DiscoveryCache(
+            DISCOVERY_CACHE_DIR,
+            max_entries=DISCOVERY_CACHE_MAX_ENTRIES,
+            ttl_s=DISCOVERY_CACHE_TTL_S,
+        )
 
     if "provider" not in st.session_state:
         st.session_state["provider"] = DEFAULT_AI_PROVIDER
@@ -98,6 +119,8 @@ def run_app():
                         api_key=api_key,
                         ai_model=ai_model_name,
                         ai_provider=provider,
+                        stream=True,
+                        on_partial_response=_show_partial_response(st.empty()),
                     )
 
                     st.session_state["model_gen"] = process_model
@@ -109,7 +132,7 @@ def run_app():
         elif input_type == InputType.DATA.value:
             uploaded_log = st.file_uploader(
                 "For **process model discovery**, upload an event log:",
-                type=["xes", "gz"],
+                type=["xes", "gz", "parquet", "csv"],
                 help=DISCOVERY_HELP,
             )
 
@@ -133,12 +156,11 @@ def run_app():
                         mode="wb", delete=False, dir=temp_dir, suffix=uploaded_log.name
                     ) as temp_file:
                         temp_file.write(contents)
-                        log = import_event_log(temp_file.name)
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-
+                    # with a cache, another threshold reuses the variants of the same log
                     process_model = promoai.generate_model_from_event_log(
-                        log, threshold
+                        temp_file.name, threshold, cache=discovery_cache
                     )
+                    shutil.rmtree(temp_dir, ignore_errors=True)
 
                     st.session_state["model_gen"] = process_model
                     st.session_state["feedback"] = []
@@ -222,6 +244,8 @@ def run_app():
                                 api_key=api_key,
                                 ai_model=ai_model_name,
                                 ai_provider=provider,
+                                stream=True,
+                                on_partial_response=_show_partial_response(st.empty()),
                             )
                             st.session_state["model_gen"] = process_model
                         except Exception as e:
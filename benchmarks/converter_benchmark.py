@@ -0,0 +1,217 @@
+"""
+Scaling benchmark for the Petri net to POWL converter.
+
+Random block-structured POWL models of controlled size, depth, and operator mix are converted into
+workflow nets with powl and back with ``convert_workflow_net_to_powl``. For each size, the median
+conversion time, the peak memory (traced separately), the per-phase times of the converter, and the
+number of round trips that preserve the footprints of the original model are reported. Computing the
+footprints explores the state space of the net, so the round trip is only checked for models up to
+``--max-check-size`` activities.
+
+Run from the repository root with promoai installed (e.g., ``pip install -e .``).
+
+Usage:
+    python benchmarks/converter_benchmark.py --sizes 10 25 50 100 --models 5
+    python benchmarks/converter_benchmark.py --mix xor=1 loop=0 partial_order=2 sequence=1 --json out.json
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+import pm4py
+from powl import convert_to_petri_net
+from powl.objects.obj import Operator, OperatorPOWL, POWL, StrictPartialOrder, Transition
+
+from promoai.pn_to_powl.converter import convert_workflow_net_to_powl
+from promoai.pn_to_powl.converter_utils.profiling import ConversionProfiler
+
+OPERATORS = ["xor", "loop", "partial_order", "sequence"]
+
+
+def random_powl_model(
+    rng: random.Random,
+    size: int,
+    max_depth: int,
+    mix: dict[str, float],
+    max_children: int = 4,
+) -> POWL:
+    """
+    Generate a random block-structured POWL model with ``size`` activities and a nesting depth of
+    at most ``max_depth``; operators are drawn with the weights given in ``mix``.
+    """
+    counter = [0]
+
+    def activity():
+        counter[0] += 1
+        return Transition(label=f"a{counter[0]}")
+
+    def build(size, depth):
+        if size == 1:
+            return activity()
+        if depth >= max_depth:
+            # flat sequence of the remaining activities
+            return _partial_order([activity() for _ in range(size)], rng, True)
+
+        operators = [op for op in OPERATORS if mix.get(op, 0) > 0]
+        operator = rng.choices(operators, weights=[mix[op] for op in operators])[0]
+        if operator == "loop":
+            do_size = rng.randint(1, size - 1)
+            return OperatorPOWL(
+                Operator.LOOP,
+                [build(do_size, depth + 1), build(size - do_size, depth + 1)],
+            )
+
+        number_of_children = rng.randint(2, min(max_children, size))
+        sizes = [1] * number_of_children
+        for _ in range(size - number_of_children):
+            sizes[rng.randrange(number_of_children)] += 1
+        children = [build(s, depth + 1) for s in sizes]
+        if operator == "xor":
+            return OperatorPOWL(Operator.XOR, children)
+        return _partial_order(children, rng, operator == "sequence")
+
+    return build(size, 0)
+
+
+def _partial_order(children, rng, sequence, edge_probability=0.4):
+    po = StrictPartialOrder(children)
+    for i in range(len(children)):
+        for j in range(i + 1, len(children)):
+            if (j == i + 1) if sequence else rng.random() < edge_probability:
+                po.order.add_edge(children[i], children[j])
+    po.order.add_transitive_edges()
+    return po
+
+
+def _footprints(powl_model):
+    net, im, fm = convert_to_petri_net(powl_model)
+    return pm4py.discover_footprints(net, im, fm)
+
+
+def benchmark_size(
+    size: int,
+    models: int,
+    max_depth: int,
+    mix: dict[str, float],
+    seed: int,
+    max_check_size: int,
+) -> dict:
+    times = []
+    peaks = []
+    transitions = []
+    places = []
+    equivalent = 0 if size <= max_check_size else None
+    failed = 0
+    profiler = ConversionProfiler()
+
+    for i in range(models):
+        rng = random.Random(f"{seed}-{size}-{i}")
+        model = random_powl_model(rng, size, max_depth, mix)
+        net, im, fm = convert_to_petri_net(model)
+        transitions.append(len(net.transitions))
+        places.append(len(net.places))
+
+        try:
+            start = time.perf_counter()
+            converted = convert_workflow_net_to_powl(net, profiler=profiler)
+            times.append(time.perf_counter() - start)
+
+            # the conversion modifies the net, so the memory is measured on a fresh copy
+            net, im, fm = convert_to_petri_net(model)
+            tracemalloc.start()
+            convert_workflow_net_to_powl(net)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        except Exception:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            failed += 1
+            continue
+
+        if equivalent is not None and _footprints(converted) == _footprints(model):
+            equivalent += 1
+
+    return {
+        "size": size,
+        "models": models,
+        "median_transitions": statistics.median(transitions),
+        "median_places": statistics.median(places),
+        "median_seconds": statistics.median(times) if times else None,
+        "max_seconds": max(times) if times else None,
+        "median_peak_kib": statistics.median(peaks) / 1024 if peaks else None,
+        "equivalent": equivalent,
+        "failed": failed,
+        "phases": profiler.to_dict()["phases"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 25, 50, 100],
+        help="numbers of activities per model (powl's Petri net conversion becomes very slow"
+        " beyond a few hundred activities)",
+    )
+    parser.add_argument("--models", type=int, default=5, help="models per size")
+    parser.add_argument("--max-depth", type=int, default=8, help="maximal nesting depth")
+    parser.add_argument(
+        "--mix",
+        nargs="+",
+        default=[f"{op}=1" for op in OPERATORS],
+        help="operator weights, e.g., xor=1 loop=0.5 partial_order=2 sequence=1",
+    )
+    parser.add_argument(
+        "--max-check-size",
+        type=int,
+        default=50,
+        help="check the round trip only for models up to this number of activities",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the full results to this file")
+    args = parser.parse_args(argv)
+
+    mix = {}
+    for entry in args.mix:
+        operator, weight = entry.split("=")
+        if operator not in OPERATORS:
+            parser.error(f"unknown operator '{operator}', expected one of {OPERATORS}")
+        mix[operator] = float(weight)
+
+    results = []
+    print(
+        f"{'size':>6} {'trans.':>7} {'places':>7} {'median s':>10} {'max s':>10}"
+        f" {'peak KiB':>10} {'equiv.':>7} {'failed':>7}"
+    )
+    for size in args.sizes:
+        result = benchmark_size(
+            size, args.models, args.max_depth, mix, args.seed, args.max_check_size
+        )
+        results.append(result)
+        print(
+            f"{size:>6} {result['median_transitions']:>7} {result['median_places']:>7}"
+            f" {_format(result['median_seconds'], '.4f'):>10}"
+            f" {_format(result['max_seconds'], '.4f'):>10}"
+            f" {_format(result['median_peak_kib'], '.1f'):>10}"
+            f" {_format(result['equivalent'], 'd'):>7} {result['failed']:>7}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"arguments": vars(args), "mix": mix, "results": results}, f, indent=2
+            )
+
+
+def _format(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+if __name__ == "__main__":
+    main()
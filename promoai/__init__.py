@@ -1,5 +1,13 @@
+from promoai.discovery.discovery_cache import DiscoveryCache
 from promoai.general_utils.ai_providers import AIProviders
 from promoai.general_utils.app_utils import InputType
+from promoai.general_utils.llm_connection import set_response_cache, set_retry_policy
+from promoai.general_utils.rate_limiting import set_rate_limit
+from promoai.general_utils.response_cache import (
+    MemoryResponseCache,
+    SQLiteResponseCache,
+)
+from promoai.general_utils.retry_policy import RetryPolicy
 from promoai.main import (
     generate_model_from_bpmn,
     generate_model_from_event_log,
@@ -7,6 +15,7 @@ from promoai.main import (
     generate_model_from_text,
     query_bpmn,
 )
+from promoai.pn_to_powl.conversion_cache import ConversionCache
 
 __name__ = "promoai"
 __version__ = "1.4.6"
@@ -0,0 +1,137 @@
+"""
+Batch conversion of PNML/BPMN models into POWL code.
+
+Usage:
+    python -m promoai.batch_conversion <directory or manifest> -o results.jsonl [-j WORKERS]
+
+A manifest is a text file listing one model path per line (relative paths are resolved against the
+manifest's directory; empty lines and lines starting with '#' are ignored). Each converted model is
+written to the output as one JSON line as soon as it finishes.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from pm4py import convert_to_petri_net, read_bpmn, read_pnml
+
+from promoai.pn_to_powl.converter import convert_workflow_net_to_powl
+from promoai.pn_to_powl.converter_utils.powl_to_code import translate_powl_to_code
+
+SUPPORTED_EXTENSIONS = (".pnml", ".bpmn")
+
+
+def convert_model_file(file_path: str) -> str:
+    """
+    Convert a PNML or BPMN file into the code of the equivalent POWL model.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".pnml":
+        pn, im, fm = read_pnml(file_path)
+    elif extension == ".bpmn":
+        pn, im, fm = convert_to_petri_net(read_bpmn(file_path))
+    else:
+        raise Exception(f"Unsupported file type: {file_path}")
+    powl_model = convert_workflow_net_to_powl(pn)
+    return translate_powl_to_code(powl_model)
+
+
+def collect_model_files(source: str) -> list[str]:
+    """
+    List the model files of a directory (recursively) or of a manifest file.
+    """
+    if os.path.isdir(source):
+        files = []
+        for root, _, names in os.walk(source):
+            for name in names:
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    files.append(os.path.join(root, name))
+        return sorted(files)
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    files = []
+    with open(source, "r") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                files.append(os.path.join(base_dir, line))
+    return files
+
+
+def _convert_entry(file_path: str) -> dict:
+    start = time.perf_counter()
+    try:
+        record = {
+            "file": file_path,
+            "status": "ok",
+            "powl_code": convert_model_file(file_path),
+        }
+    except Exception as e:
+        record = {
+            "file": file_path,
+            "status": "error",
+            "error": f"{type(e).__name__}: {e}",
+        }
+    record["seconds"] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def convert_batch(
+    file_paths: list[str], max_workers: Optional[int] = None
+) -> Iterator[dict]:
+    """
+    Convert the given model files in a process pool and yield one record per file in the order
+    in which the conversions finish.
+
+    Each record contains the file path, the status ('ok' or 'error'), the POWL code or the error
+    message, and the conversion time in seconds.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_convert_entry, path) for path in file_paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Convert PNML/BPMN models into POWL code."
+    )
+    parser.add_argument(
+        "source", help="directory with .pnml/.bpmn files or a manifest file"
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="JSONL output file (default: stdout)"
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, default=None, help="number of worker processes"
+    )
+    args = parser.parse_args(argv)
+
+    file_paths = collect_model_files(args.source)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    failed = 0
+    start = time.perf_counter()
+    try:
+        for record in convert_batch(file_paths, max_workers=args.workers):
+            if record["status"] != "ok":
+                failed += 1
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(
+        f"Converted {len(file_paths) - failed} of {len(file_paths)} models"
+        f" ({failed} failed) in {time.perf_counter() - start:.2f}s",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
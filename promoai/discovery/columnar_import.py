@@ -0,0 +1,59 @@
+import pandas as pd
+
+COLUMNAR_EXTENSIONS = (".parquet", ".csv")
+
+
+def read_event_table(
+    file_path: str,
+    case_id_key: str = "case:concept:name",
+    activity_key: str = "concept:name",
+    timestamp_key: str = "time:timestamp",
+) -> pd.DataFrame:
+    """
+    Read the case, activity, and timestamp columns of a Parquet or CSV event log with Arrow and
+    return them as a dataframe sorted by case and timestamp.
+
+    Only the three columns are read, the sort runs on the Arrow table, and the conversion to pandas
+    reuses the Arrow buffers where the column types allow it. Requires pyarrow.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        raise ImportError(
+            "Reading Parquet/CSV event logs requires pyarrow (pip install pyarrow)!"
+        )
+
+    columns = [case_id_key, activity_key, timestamp_key]
+    extension = file_path.lower()
+    if extension.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(file_path, columns=columns)
+    elif extension.endswith(".csv"):
+        import pyarrow.csv as pv
+
+        table = pv.read_csv(
+            file_path,
+            convert_options=pv.ConvertOptions(
+                include_columns=columns,
+                column_types={case_id_key: pa.string(), activity_key: pa.string()},
+            ),
+        )
+    else:
+        raise ValueError(f"Unsupported file type: {file_path}")
+
+    missing = [c for c in columns if c not in table.column_names]
+    if missing:
+        raise ValueError(f"Columns not found in the event log: {missing}")
+
+    if not pa.types.is_timestamp(table.schema.field(timestamp_key).type):
+        # e.g., timestamps that Arrow did not infer while reading a CSV file
+        table = table.set_column(
+            table.schema.get_field_index(timestamp_key),
+            timestamp_key,
+            pc.cast(table.column(timestamp_key), pa.timestamp("us")),
+        )
+
+    table = table.sort_by([(case_id_key, "ascending"), (timestamp_key, "ascending")])
+    return table.to_pandas()
@@ -0,0 +1,38 @@
+from collections import Counter
+
+from pm4py.algo.discovery.inductive.dtypes.im_ds import IMDataStructureUVCL
+from pm4py.objects.dfg.obj import DFG
+from powl import discover_from_dfg
+from powl.discovery.total_order_based.inductive.variants.powl_discovery_varaints import (
+    POWLDiscoveryVariant,
+)
+from powl.general_utils.dfg_frequency_filtering import (
+    filter_dfg_noise_keep_activities_and_repair,
+)
+from powl.objects.obj import POWL
+
+
+def filter_dfg_noise(dfg: DFG, threshold: float) -> DFG:
+    """
+    Remove infrequent directly-follows edges and start/end activities (relative to the most frequent
+    outgoing edge of each activity), as powl's DFG frequency filtering does, while keeping every
+    activity on a path from the start to the end.
+    """
+    if threshold <= 0:
+        return dfg
+    return filter_dfg_noise_keep_activities_and_repair(
+        IMDataStructureUVCL(Counter(), dfg), threshold
+    ).dfg
+
+
+def discover_powl_from_dfg(dfg: DFG, threshold: float = 0.0) -> POWL:
+    """
+    Discover a POWL model from directly-follows counts only, after filtering noise with the given
+    threshold (0 <= threshold < 1).
+    """
+    if not dfg.start_activities or not dfg.end_activities:
+        raise Exception("The event log does not contain any (completed) events!")
+    return discover_from_dfg(
+        filter_dfg_noise(dfg, threshold),
+        variant=POWLDiscoveryVariant.DECISION_GRAPH_MAX,
+    )
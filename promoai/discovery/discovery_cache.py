@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import Optional
+
+import pandas as pd
+from pm4py.objects.dfg.obj import DFG
+
+# bump when the way the directly-follows counts are derived changes, so stale entries are not reused
+CACHE_VERSION = "2"
+
+FINGERPRINT_COLUMNS = [
+    "case:concept:name",
+    "concept:name",
+    "time:timestamp",
+    "lifecycle:transition",
+]
+
+
+def log_fingerprint(event_log) -> str:
+    """
+    Content hash of an event log: the bytes of the file for a path, the case, activity, timestamp,
+    and lifecycle columns for a dataframe (or pm4py event log).
+    """
+    digest = hashlib.sha256()
+    if isinstance(event_log, str):
+        digest.update(b"file:")
+        with open(event_log, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    if not isinstance(event_log, pd.DataFrame):
+        import pm4py
+
+        event_log = pm4py.convert_to_dataframe(event_log)
+    columns = [c for c in FINGERPRINT_COLUMNS if c in event_log.columns]
+    digest.update(("dataframe:" + json.dumps(columns)).encode("utf-8"))
+    digest.update(
+        pd.util.hash_pandas_object(event_log[columns], index=False).values.tobytes()
+    )
+    return digest.hexdigest()
+
+
+class DiscoveryCache:
+    """
+    On-disk cache of the trace variants (or, for the streaming discovery, the directly-follows
+    counts) of event logs.
+
+    Entries are keyed by the content fingerprint of the log, so discovering a model from the same
+    log again (e.g., with a different noise filtering threshold) skips parsing and aggregating it.
+    Entries expire ``ttl_s`` seconds after they were stored (never if None), and the least recently
+    used entries are evicted beyond ``max_entries``; the modification time of an entry file is its
+    creation time and its access time is the time of its last use.
+    """
+
+    def __init__(
+        self, directory: str, max_entries: int = 256, ttl_s: Optional[float] = None
+    ):
+        self.directory = os.path.join(directory, "v" + CACHE_VERSION)
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_s is not None and time.time() - created > self.ttl_s
+
+    def _read(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            created = os.stat(path).st_mtime
+            if self._expired(created):
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path, (time.time(), created))
+            return entry
+        except (OSError, ValueError):
+            # missing (or concurrently evicted) and corrupt entries are misses
+            return None
+
+    def _write(self, key: str, entry: dict):
+        # write to a temporary file first, so concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        now = time.time()
+        os.utime(temp_path, (now, now))
+        os.replace(temp_path, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for file in os.scandir(self.directory):
+            if not file.name.endswith(".json"):
+                continue
+            try:
+                stat = file.stat()
+                if self._expired(stat.st_mtime):
+                    os.remove(file.path)
+                else:
+                    entries.append((stat.st_atime, file.path))
+            except FileNotFoundError:
+                pass
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[DFG]:
+        entry = self._read(key)
+        if entry is None:
+            return None
+
+        dfg = DFG()
+        for source, target, count in entry["graph"]:
+            dfg.graph[(source, target)] = count
+        for activity, count in entry["start_activities"]:
+            dfg.start_activities[activity] = count
+        for activity, count in entry["end_activities"]:
+            dfg.end_activities[activity] = count
+        return dfg
+
+    def put(self, key: str, dfg: DFG):
+        # pairs instead of objects, so non-string activity labels survive the round trip
+        entry = {
+            "graph": [[s, t, int(c)] for (s, t), c in dfg.graph.items()],
+            "start_activities": [[a, int(c)] for a, c in dfg.start_activities.items()],
+            "end_activities": [[a, int(c)] for a, c in dfg.end_activities.items()],
+        }
+        self._write(key, entry)
+
+    def get_variants(self, key: str) -> Optional[Counter]:
+        entry = self._read(key)
+        if entry is None:
+            return None
+        # in the stored order, which the discovery may depend on
+        return Counter({tuple(variant): count for variant, count in entry["variants"]})
+
+    def put_variants(self, key: str, variants: Counter):
+        entry = {"variants": [[list(v), int(c)] for v, c in variants.items()]}
+        self._write(key, entry)
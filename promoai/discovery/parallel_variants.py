@@ -0,0 +1,137 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from promoai.discovery.xes_streaming import COMPLETION_VALUES
+
+PARALLEL_MIN_EVENTS = 100000
+
+
+def discover_variants_parallel(
+    log: pd.DataFrame,
+    workers: Optional[int] = None,
+    min_parallel_events: int = PARALLEL_MIN_EVENTS,
+    activity_key: str = "concept:name",
+    timestamp_key: str = "time:timestamp",
+    case_id_key: str = "case:concept:name",
+    lifecycle_key: str = "lifecycle:transition",
+    keep_only_completion_events: bool = True,
+) -> Counter:
+    """
+    Count the trace variants of an event log with several processes, as powl's discovery derives
+    them from the log (same events, same order of the events and of the variants).
+
+    The cases are partitioned into one chunk per worker; each worker orders the events of its cases
+    by timestamp and collects their variants, and the counters are merged in the order of the
+    cases. Logs with fewer than ``min_parallel_events`` events are handled in the current process.
+
+    - workers: number of worker processes (defaults to the number of CPUs)
+    """
+    cases, activity_codes, activities, timestamps = _encode_log(
+        log,
+        activity_key,
+        timestamp_key,
+        case_id_key,
+        lifecycle_key,
+        keep_only_completion_events,
+    )
+    counts = _map_case_chunks(
+        _collect_variants,
+        cases,
+        activity_codes,
+        timestamps,
+        workers,
+        min_parallel_events,
+    )
+
+    variants = Counter()
+    for chunk_variants in counts:
+        for variant, count in chunk_variants.items():
+            variants[tuple(activities[code] for code in variant)] += count
+    return variants
+
+
+def _encode_log(
+    log: pd.DataFrame,
+    activity_key: str,
+    timestamp_key: str,
+    case_id_key: str,
+    lifecycle_key: str,
+    keep_only_completion_events: bool,
+) -> tuple[np.ndarray, np.ndarray, list, np.ndarray]:
+    if not isinstance(log, pd.DataFrame):
+        import pm4py
+
+        log = pm4py.convert_to_dataframe(log)
+
+    if keep_only_completion_events and lifecycle_key in log.columns:
+        filtered_log = log[log[lifecycle_key].isin(COMPLETION_VALUES)]
+        if len(filtered_log) > 0:
+            log = filtered_log
+
+    # case codes in the sorted order of the case identifiers, as pm4py groups the traces
+    cases = pd.factorize(log[case_id_key], sort=True)[0]
+    activity_codes, activities = pd.factorize(log[activity_key])
+    timestamps = (
+        pd.to_datetime(log[timestamp_key], utc=True)
+        .to_numpy(dtype="datetime64[ns]")
+        .view("int64")
+    )
+    return cases, activity_codes, activities.tolist(), timestamps
+
+
+def _map_case_chunks(
+    function,
+    cases: np.ndarray,
+    activity_codes: np.ndarray,
+    timestamps: np.ndarray,
+    workers: Optional[int],
+    min_parallel_events: int,
+) -> list:
+    workers = workers or os.cpu_count() or 1
+    number_of_cases = cases.max() + 1 if len(cases) else 0
+    number_of_chunks = max(1, min(workers, number_of_cases))
+    if len(cases) < min_parallel_events:
+        number_of_chunks = 1
+
+    if number_of_chunks == 1:
+        return [function(cases, activity_codes, timestamps)]
+
+    # contiguous ranges of case codes; selecting with a stable argsort keeps the original order of
+    # the events, so ties in the timestamps are resolved as in a stable sort
+    chunk_of_event = cases * number_of_chunks // number_of_cases
+    order = np.argsort(chunk_of_event, kind="stable")
+    bounds = np.searchsorted(chunk_of_event[order], np.arange(1, number_of_chunks))
+    chunks = np.split(order, bounds)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                function,
+                [cases[c] for c in chunks],
+                [activity_codes[c] for c in chunks],
+                [timestamps[c] for c in chunks],
+            )
+        )
+
+
+def _collect_variants(
+    cases: np.ndarray,
+    activity_codes: np.ndarray,
+    timestamps: np.ndarray,
+) -> Counter:
+    if len(cases) == 0:
+        return Counter()
+
+    order = np.lexsort((timestamps, cases))
+    cases = cases[order]
+    activity_codes = activity_codes[order].tolist()
+    bounds = np.flatnonzero(cases[1:] != cases[:-1]) + 1
+    starts = [0] + bounds.tolist()
+    ends = bounds.tolist() + [len(cases)]
+    return Counter(
+        tuple(activity_codes[start:end]) for start, end in zip(starts, ends)
+    )
@@ -0,0 +1,30 @@
+from collections import Counter
+
+from pm4py.algo.discovery.inductive.variants.imf import IMFParameters
+from powl.discovery.total_order_based import algorithm as powl_discovery
+from powl.discovery.total_order_based.inductive.utils.filtering import (
+    FILTERING_TYPE,
+    FilteringType,
+)
+from powl.discovery.total_order_based.inductive.variants.powl_discovery_varaints import (
+    POWLDiscoveryVariant,
+)
+from powl.objects.obj import POWL
+
+
+def discover_powl_from_variants(variants: Counter, threshold: float = 0.0) -> POWL:
+    """
+    Discover a POWL model from the trace variants of an event log, with the algorithm and the DFG
+    frequency filtering (0 <= threshold < 1) of powl's discovery from the log itself.
+    """
+    if not variants:
+        raise Exception("The event log does not contain any (completed) events!")
+    parameters = {
+        IMFParameters.NOISE_THRESHOLD: threshold,
+        FILTERING_TYPE: FilteringType.DFG_FREQUENCY,
+    }
+    return powl_discovery.apply(
+        variants,
+        parameters=parameters,
+        variant=POWLDiscoveryVariant.DECISION_GRAPH_CYCLIC,
+    )
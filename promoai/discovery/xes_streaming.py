@@ -0,0 +1,90 @@
+import gzip
+from xml.etree.ElementTree import iterparse
+
+from pm4py.objects.dfg.obj import DFG
+
+COMPLETION_VALUES = {"complete", "COMPLETE", "Complete"}
+
+
+def discover_dfg_from_xes(
+    file_path: str,
+    activity_key: str = "concept:name",
+    lifecycle_key: str = "lifecycle:transition",
+    keep_only_completion_events: bool = True,
+) -> DFG:
+    """
+    Count the directly-follows relations, start activities, and end activities of an XES or XES.GZ
+    file while parsing it, without loading the log.
+
+    Only the previous activity of the current trace is kept, and each parsed element is cleared
+    right away, so the memory does not grow with the size of the log. Events are taken in document
+    order; if ``keep_only_completion_events`` is set, events whose lifecycle transition is not
+    'complete' are skipped.
+    """
+    dfg = DFG()
+    graph = dfg.graph
+    start_activities = dfg.start_activities
+    end_activities = dfg.end_activities
+
+    # default values of event attributes declared in <global scope="event">
+    event_defaults = {}
+    in_event_globals = False
+    previous = None
+    root = None
+
+    opener = gzip.open if file_path.lower().endswith(".gz") else open
+    with opener(file_path, "rb") as f:
+        for action, elem in iterparse(f, events=("start", "end")):
+            tag = _local_name(elem.tag)
+
+            if action == "start":
+                if root is None:
+                    root = elem
+                elif tag == "global" and elem.get("scope") == "event":
+                    in_event_globals = True
+                continue
+
+            if tag == "event":
+                values = {}
+                for child in elem:
+                    key = child.get("key")
+                    if key == activity_key or key == lifecycle_key:
+                        values[key] = child.get("value")
+                elem.clear()
+
+                activity = values.get(activity_key, event_defaults.get(activity_key))
+                lifecycle = values.get(lifecycle_key, event_defaults.get(lifecycle_key))
+                if activity is None or (
+                    keep_only_completion_events
+                    and lifecycle is not None
+                    and lifecycle not in COMPLETION_VALUES
+                ):
+                    continue
+
+                if previous is None:
+                    start_activities[activity] += 1
+                else:
+                    graph[(previous, activity)] += 1
+                previous = activity
+
+            elif tag == "trace":
+                if previous is not None:
+                    end_activities[previous] += 1
+                previous = None
+                # drop the trace and everything parsed before it
+                root.clear()
+
+            elif tag == "global":
+                in_event_globals = False
+
+            elif in_event_globals:
+                key = elem.get("key")
+                if key is not None:
+                    event_defaults[key] = elem.get("value")
+
+    return dfg
+
+
+def _local_name(tag: str) -> str:
+    # strip the XML namespace, e.g., '{http://www.xes-standard.org/}trace'
+    return tag.rsplit("}", 1)[-1]
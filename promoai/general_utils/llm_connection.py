@@ -1,19 +1,34 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from http.cookiejar import DefaultCookiePolicy
 
-from typing import Any, Callable, List, Optional, Tuple, TypeVar
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
 
 import cohere  # per colleague change
 from google import genai  # per colleague change
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 
 from promoai.general_utils import constants
 
 from promoai.general_utils.ai_providers import AIProviders
+from promoai.general_utils.rate_limiting import estimate_tokens, get_rate_limiter
+from promoai.general_utils.response_cache import request_key, ResponseCache
+from promoai.general_utils.retry_policy import parse_retry_after, RetryPolicy
+from promoai.model_generation.code_extraction import PYTHON_CODE_PATTERN
 from promoai.prompting.prompt_engineering import ERROR_MESSAGE_FOR_MODEL_GENERATION
 
 T = TypeVar("T")
@@ -38,6 +53,7 @@ class BaseLLMError(Exception):
 
     user_message: str
     retryable: bool
+    retry_after: Optional[float]
 
     def __init__(
         self,
@@ -45,13 +61,16 @@ class BaseLLMError(Exception):
         *,
         retryable: bool = False,
         details: Optional[str] = None,
+        retry_after: Optional[float] = None,
     ):
         """
         user_message -> Short, user-friendly text to show first.
         details -> Full technical details to append in the exception message.
+        retry_after -> Seconds to wait before retrying, if the provider said so.
         """
         self.user_message = user_message
         self.retryable = retryable
+        self.retry_after = retry_after
         if details:
             full_message = f"{user_message}\n\nDetails: {details}"
         else:
@@ -128,6 +147,30 @@ def _user_message(kind: str, extra: Optional[str] = None) -> str:
     return base
 
 
+def _retry_after(resp) -> Optional[float]:
+    """Retry delay requested by a provider response (also of the responses attached to SDK errors)."""
+    headers = getattr(resp, "headers", None)
+    if not headers:
+        return None
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return max(0.0, float(retry_after_ms) / 1000)
+        return parse_retry_after(headers.get("retry-after"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _is_server_or_connection_error(e: Exception) -> bool:
+    """Whether an SDK error is a 5xx response or a failed connection, i.e., worth retrying."""
+    status = getattr(e, "status_code", None) or getattr(e, "code", None)
+    if isinstance(status, int):
+        return status >= 500
+    return isinstance(
+        e, (ConnectionError, httpx.TransportError, requests.ConnectionError)
+    )
+
+
 def _raise_for_status(resp: requests.Response) -> None:
     """Map HTTP errors to our typed exceptions with user-safe messages."""
     status = resp.status_code
@@ -148,26 +191,282 @@ def _raise_for_status(resp: requests.Response) -> None:
         raise AuthError(_user_message("auth"), retryable=False, details=safe_log)
     if status in (429,):
         raise RateLimitError(
-            _user_message("rate_limit"), retryable=True, details=safe_log
+            _user_message("rate_limit"),
+            retryable=True,
+            details=safe_log,
+            retry_after=_retry_after(resp),
         )
     if status in (500, 502, 503, 504):
         raise ServiceUnavailableError(
-            _user_message("unavailable"), retryable=True, details=safe_log
+            _user_message("unavailable"),
+            retryable=True,
+            details=safe_log,
+            retry_after=_retry_after(resp),
         )
 
     raise UnexpectedResponseError(
-        _user_message("unexpected"), retryable=True, details=safe_log
+        _user_message("unexpected"), retryable=False, details=safe_log
     )
 
 
+# -----------------------------------------------------------------------------
+# HTTP sessions (one keep-alive connection pool per provider origin)
+# -----------------------------------------------------------------------------
+DEFAULT_POOL_SIZE = 10
+
+_sessions: dict[str, requests.Session] = {}
+_pool_sizes: dict[str, int] = {}
+_sessions_lock = threading.Lock()
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def configure_connection_pool(base_url: str, pool_size: int) -> None:
+    """
+    Set the maximal number of pooled keep-alive connections to a provider base URL (e.g., for many
+    concurrent generations against the same provider). Replaces the existing pool of that URL.
+    """
+    origin = _origin(base_url)
+    with _sessions_lock:
+        _pool_sizes[origin] = pool_size
+        session = _sessions.pop(origin, None)
+    if session is not None:
+        session.close()
+
+
+def close_sessions() -> None:
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def _get_session(url: str) -> requests.Session:
+    origin = _origin(url)
+    with _sessions_lock:
+        session = _sessions.get(origin)
+        if session is None:
+            pool_size = _pool_sizes.get(origin, DEFAULT_POOL_SIZE)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # the session is shared across threads and API keys, so it must not keep any
+            # per-request state; the urllib3 pool itself is thread-safe
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            _sessions[origin] = session
+        return session
+
+
+def _requests_send(
+    url: str,
+    *,
+    headers: dict,
+    json_: dict,
+    timeout_s: Tuple[float, float],
+    stream: bool = False,
+) -> requests.Response:
+    try:
+        resp = _get_session(url).post(
+            url, headers=headers, json=json_, timeout=timeout_s, stream=stream
+        )
+    except requests.Timeout as e:
+        raise TimeoutError(_user_message("timeout"), retryable=True, details=str(e))
+    except requests.RequestException as e:
+        logger.warning("Network error to %s: %s", url, _redact(str(e)))
+        raise ServiceUnavailableError(
+            _user_message("unavailable"), retryable=True, details=str(e)
+        )
+
+    if not (200 <= resp.status_code < 300):
+        _raise_for_status(resp)
+    return resp
+
+
 def _requests_post(
     url: str, *, headers: dict, json_: dict, timeout_s: Tuple[float, float]
 ) -> dict:
+    resp = _requests_send(url, headers=headers, json_=json_, timeout_s=timeout_s)
     try:
-        resp = requests.post(url, headers=headers, json=json_, timeout=timeout_s)
-    except requests.Timeout as e:
+        return resp.json()
+    except ValueError as e:
+        raise UnexpectedResponseError(
+            _user_message("unexpected"), retryable=False, details=str(e)
+        )
+
+
+def _requests_stream_events(
+    url: str, *, headers: dict, json_: dict, timeout_s: Tuple[float, float]
+) -> Iterator[dict]:
+    """Post the request and yield the JSON payloads of the server-sent events of the response."""
+    resp = _requests_send(
+        url, headers=headers, json_=json_, timeout_s=timeout_s, stream=True
+    )
+    with resp:
+        try:
+            for line in resp.iter_lines():
+                # decoded here, as event streams often declare no charset
+                line = line.decode("utf-8")
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    return
+                try:
+                    yield json.loads(data)
+                except ValueError as e:
+                    raise UnexpectedResponseError(
+                        _user_message("unexpected"), retryable=False, details=str(e)
+                    )
+        except requests.Timeout as e:
+            raise TimeoutError(
+                _user_message("timeout"), retryable=True, details=str(e)
+            )
+        except requests.RequestException as e:
+            logger.warning("Network error to %s: %s", url, _redact(str(e)))
+            raise ServiceUnavailableError(
+                _user_message("unavailable"), retryable=True, details=str(e)
+            )
+
+
+# -----------------------------------------------------------------------------
+# SDK clients (created once per provider and API key)
+# -----------------------------------------------------------------------------
+# The SDK clients are created without their own retries (Google's client does not retry by
+# default), so the retry policy is the only retry layer and sees every attempt.
+MAX_CACHED_CLIENTS = 32
+
+_clients: OrderedDict[tuple[str, str], Any] = OrderedDict()
+_clients_lock = threading.Lock()
+# async clients are bound to the event loop they are used in: loop id -> clients of the loop
+_async_clients: dict[int, _LoopClients] = {}
+
+
+def _get_client(
+    provider: str,
+    api_key: str,
+    factory: Callable[[], T],
+    clients: Optional[OrderedDict] = None,
+    on_evict: Optional[Callable[[Any], None]] = None,
+) -> T:
+    """
+    Return the SDK client of the provider for the API key, creating it with ``factory`` on first
+    use. The least recently used clients are dropped beyond ``MAX_CACHED_CLIENTS`` and passed to
+    ``on_evict``; otherwise they are not closed, as another thread may still be using them.
+    """
+    if clients is None:
+        clients = _clients
+    # the registry only holds a hash of the key
+    key = (provider, hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+    with _clients_lock:
+        client = clients.get(key)
+        if client is not None:
+            clients.move_to_end(key)
+            return client
+
+    # created outside the lock, as the SDKs may set up connections; if two threads race, the
+    # first registered client wins
+    client = factory()
+    with _clients_lock:
+        client = clients.setdefault(key, client)
+        clients.move_to_end(key)
+        while len(clients) > MAX_CACHED_CLIENTS:
+            _, evicted = clients.popitem(last=False)
+            if on_evict is not None:
+                on_evict(evicted)
+    return client
+
+
+class _LoopClients:
+    """
+    Async clients used in one event loop. An evicted client is closed once the requests that are
+    still using it are done.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.clients: OrderedDict = OrderedDict()
+        self.in_use: dict[int, int] = {}
+        self.evicted: list = []
+
+    async def close_evicted(self):
+        idle = [c for c in self.evicted if id(c) not in self.in_use]
+        self.evicted = [c for c in self.evicted if id(c) in self.in_use]
+        for client in idle:
+            try:
+                await _aclose_client(client)
+            except Exception as e:
+                logger.warning("Failed to close an evicted client: %s", e)
+
+
+async def _aclose_client(client) -> None:
+    close = getattr(client, "aclose", None) or getattr(client, "close", None)
+    if close is None:
+        # the Cohere SDK client has no close method; close the httpx client it wraps
+        wrapper = getattr(client, "_client_wrapper", None)
+        http_client = getattr(wrapper, "httpx_client", None)
+        close = getattr(getattr(http_client, "httpx_client", None), "aclose", None)
+    if close is not None:
+        await close()
+
+
+@asynccontextmanager
+async def _async_client(provider: str, api_key: str, factory: Callable[[], T]):
+    """Async counterpart of ``_get_client``: the client of the provider for the current loop."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        for loop_id, other in list(_async_clients.items()):
+            if other.loop.is_closed():
+                del _async_clients[loop_id]
+        entry = _async_clients.get(id(loop))
+        if entry is None or entry.loop is not loop:
+            entry = _async_clients[id(loop)] = _LoopClients(loop)
+    # only the thread of the loop uses its entry, so the counts need no lock
+    client = _get_client(
+        provider, api_key, factory, entry.clients, entry.evicted.append
+    )
+    entry.in_use[id(client)] = entry.in_use.get(id(client), 0) + 1
+    try:
+        yield client
+    finally:
+        entry.in_use[id(client)] -= 1
+        if entry.in_use[id(client)] == 0:
+            del entry.in_use[id(client)]
+        if entry.evicted:
+            await entry.close_evicted()
+
+
+async def _httpx_post(
+    url: str, *, headers: dict, json_: dict, timeout_s: Tuple[float, float]
+) -> dict:
+    """
+    Async counterpart of ``_requests_post``, using one pooled ``httpx.AsyncClient`` per provider
+    origin and event loop.
+    """
+    def create_client():
+        pool_size = _pool_sizes.get(origin, DEFAULT_POOL_SIZE)
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            )
+        )
+
+    origin = _origin(url)
+    try:
+        async with _async_client("http", origin, create_client) as client:
+            resp = await client.post(
+                url,
+                headers=headers,
+                json=json_,
+                timeout=httpx.Timeout(timeout_s[1], connect=timeout_s[0]),
+            )
+    except httpx.TimeoutException as e:
         raise TimeoutError(_user_message("timeout"), retryable=True, details=str(e))
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.warning("Network error to %s: %s", url, _redact(str(e)))
         raise ServiceUnavailableError(
             _user_message("unavailable"), retryable=True, details=str(e)
@@ -180,10 +479,180 @@ def _requests_post(
         return resp.json()
     except ValueError as e:
         raise UnexpectedResponseError(
-            _user_message("unexpected"), retryable=True, details=str(e)
+            _user_message("unexpected"), retryable=False, details=str(e)
         )
 
 
+# -----------------------------------------------------------------------------
+# Transport retries
+# -----------------------------------------------------------------------------
+_default_retry_policy: Optional[RetryPolicy] = RetryPolicy()
+_retry_policies: dict[str, Optional[RetryPolicy]] = {}
+
+
+def set_retry_policy(
+    policy: Optional[RetryPolicy], ai_provider: Optional[str] = None
+) -> None:
+    """
+    Set the policy for retrying retryable transport errors of the given provider (of all providers
+    without their own policy if None); a None policy disables retries.
+    """
+    global _default_retry_policy
+    if ai_provider is None:
+        _default_retry_policy = policy
+    else:
+        _retry_policies[ai_provider] = policy
+
+
+def _retry_delay(ai_provider: str, retry: int, error: BaseLLMError) -> Optional[float]:
+    policy = _retry_policies.get(ai_provider, _default_retry_policy)
+    if policy is None or not error.retryable:
+        return None
+    delay = policy.backoff(retry, error.retry_after)
+    if delay is None or not policy.consume_budget(ai_provider):
+        return None
+    logger.warning(
+        "%s request failed (%s); retry %d in %.1f s",
+        ai_provider,
+        type(error).__name__,
+        retry,
+        delay,
+    )
+    return delay
+
+
+def _call_with_retries(ai_provider: str, call: Callable[[], T]) -> T:
+    retry = 0
+    while True:
+        try:
+            return call()
+        except BaseLLMError as e:
+            retry += 1
+            delay = _retry_delay(ai_provider, retry, e)
+            if delay is None:
+                raise
+        time.sleep(delay)
+
+
+async def _acall_with_retries(ai_provider: str, call: Callable[[], Any]) -> Any:
+    retry = 0
+    while True:
+        try:
+            return await call()
+        except BaseLLMError as e:
+            retry += 1
+            delay = _retry_delay(ai_provider, retry, e)
+            if delay is None:
+                raise
+        await asyncio.sleep(delay)
+
+
+def _stream_with_retries(
+    ai_provider: str, open_stream: Callable[[], Iterator[str]]
+) -> Iterator[str]:
+    # a stream is only retried as long as nothing has been yielded from it
+    retry = 0
+    while True:
+        started = False
+        try:
+            for chunk in open_stream():
+                started = True
+                yield chunk
+            return
+        except BaseLLMError as e:
+            retry += 1
+            delay = None if started else _retry_delay(ai_provider, retry, e)
+            if delay is None:
+                raise
+        time.sleep(delay)
+
+
+# -----------------------------------------------------------------------------
+# Rate limiting (per provider and API key, see set_rate_limit)
+# -----------------------------------------------------------------------------
+def _prompt_tokens(conversation: List[dict[str, str]]) -> int:
+    return sum(estimate_tokens(str(m.get("content", ""))) for m in conversation)
+
+
+def _rate_limited(
+    ai_provider: str,
+    api_key: str,
+    conversation: List[dict[str, str]],
+    call: Callable[[], str],
+) -> str:
+    limiter = get_rate_limiter(ai_provider, api_key)
+    if limiter is None:
+        return call()
+    with limiter.slot(_prompt_tokens(conversation)):
+        response = call()
+    limiter.record_response_tokens(estimate_tokens(response))
+    return response
+
+
+async def _arate_limited(
+    ai_provider: str,
+    api_key: str,
+    conversation: List[dict[str, str]],
+    call: Callable[[], Any],
+) -> str:
+    limiter = get_rate_limiter(ai_provider, api_key)
+    if limiter is None:
+        return await call()
+    async with limiter.aslot(_prompt_tokens(conversation)):
+        response = await call()
+    limiter.record_response_tokens(estimate_tokens(response))
+    return response
+
+
+def _rate_limited_stream(
+    ai_provider: str,
+    api_key: str,
+    conversation: List[dict[str, str]],
+    open_stream: Callable[[], Iterator[str]],
+) -> Iterator[str]:
+    limiter = get_rate_limiter(ai_provider, api_key)
+    if limiter is None:
+        yield from open_stream()
+        return
+    # the slot is held while the response is streamed
+    parts = []
+    with limiter.slot(_prompt_tokens(conversation)):
+        try:
+            for chunk in open_stream():
+                parts.append(chunk)
+                yield chunk
+        finally:
+            limiter.record_response_tokens(estimate_tokens("".join(parts)))
+
+
+# -----------------------------------------------------------------------------
+# Response cache (disabled unless set)
+# -----------------------------------------------------------------------------
+_response_cache: Optional[ResponseCache] = None
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """
+    Put a response cache (e.g., ``MemoryResponseCache`` or ``SQLiteResponseCache``) in front of
+    ``query_llm``, ``stream_llm``, and ``aquery_llm``, so identical requests are answered from the
+    cache; None disables caching.
+    """
+    global _response_cache
+    _response_cache = cache
+
+
+def _response_cache_entry(
+    conversation: List[dict[str, str]],
+    llm_name: str,
+    ai_provider: str,
+    llm_args: Optional[dict],
+) -> Tuple[Optional[ResponseCache], Optional[str]]:
+    cache = _response_cache
+    if cache is None or not cache.accepts(llm_args):
+        return None, None
+    return cache, request_key(conversation, llm_name, ai_provider, llm_args)
+
+
 # -----------------------------------------------------------------------------
 # Public API (keeps colleague’s provider list; keeps robust handling)
 # -----------------------------------------------------------------------------
@@ -193,6 +662,35 @@ def query_llm(
     llm_name: str,
     ai_provider: str,
     llm_args : Optional[dict] = None,
+) -> str:
+    cache, key = _response_cache_entry(conversation, llm_name, ai_provider, llm_args)
+    if key is not None:
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+    response = _call_with_retries(
+        ai_provider,
+        lambda: _rate_limited(
+            ai_provider,
+            api_key,
+            conversation,
+            lambda: _query_provider(
+                conversation, api_key, llm_name, ai_provider, llm_args
+            ),
+        ),
+    )
+    if key is not None:
+        cache.put(key, response)
+    return response
+
+
+def _query_provider(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+    ai_provider: str,
+    llm_args: Optional[dict] = None,
 ) -> str:
     if ai_provider == AIProviders.GOOGLE.value:
         return generate_response_with_history_google(conversation, api_key, llm_name)
@@ -201,25 +699,7 @@ def query_llm(
     elif ai_provider == AIProviders.COHERE.value:
         return generate_response_with_history_cohere(conversation, api_key, llm_name)
     else:
-        use_responses_api_openai = False
-        if ai_provider == AIProviders.DEEPINFRA.value:
-            api_url = "https://api.deepinfra.com/v1/openai"
-        elif ai_provider == AIProviders.OPENAI.value:
-            api_url = "https://api.openai.com/v1"
-            use_responses_api_openai = True
-        elif ai_provider == AIProviders.DEEPSEEK.value:
-            api_url = "https://api.deepseek.com"
-        elif ai_provider == AIProviders.MISTRAL_AI.value:
-            api_url = "https://api.mistral.ai/v1"
-        elif ai_provider == AIProviders.OPENROUTER.value:
-            api_url = "https://openrouter.ai/api/v1"
-        elif ai_provider == AIProviders.GROK.value:
-            api_url = "https://api.x.ai/v1"
-        else:
-            raise UnsupportedProviderError(
-                _user_message("unsupported"), retryable=False
-            )
-
+        api_url, use_responses_api_openai = _openai_compatible_api(ai_provider)
         return generate_response_with_history(
             conversation,
             api_key,
@@ -230,6 +710,167 @@ def query_llm(
         )
 
 
+def stream_llm(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+    ai_provider: str,
+    llm_args: Optional[dict] = None,
+) -> Iterator[str]:
+    """
+    Streaming counterpart of ``query_llm``: yields the text of the response as it arrives.
+    """
+    cache, key = _response_cache_entry(conversation, llm_name, ai_provider, llm_args)
+    if key is not None:
+        response = cache.get(key)
+        if response is not None:
+            return iter([response])
+
+    chunks = _stream_with_retries(
+        ai_provider,
+        lambda: _rate_limited_stream(
+            ai_provider,
+            api_key,
+            conversation,
+            lambda: _stream_provider(
+                conversation, api_key, llm_name, ai_provider, llm_args
+            ),
+        ),
+    )
+    if key is not None:
+        return _cache_streamed_response(chunks, cache, key)
+    return chunks
+
+
+def _cache_streamed_response(
+    chunks: Iterator[str], cache: ResponseCache, key: str
+) -> Iterator[str]:
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    # only complete responses are stored
+    cache.put(key, "".join(parts))
+
+
+def _stream_provider(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+    ai_provider: str,
+    llm_args: Optional[dict] = None,
+) -> Iterator[str]:
+    if ai_provider == AIProviders.GOOGLE.value:
+        return stream_response_with_history_google(conversation, api_key, llm_name)
+    elif ai_provider == AIProviders.ANTHROPIC.value:
+        return stream_response_with_history_anthropic(conversation, api_key, llm_name)
+    elif ai_provider == AIProviders.COHERE.value:
+        return stream_response_with_history_cohere(conversation, api_key, llm_name)
+    else:
+        api_url, use_responses_api_openai = _openai_compatible_api(ai_provider)
+        return stream_response_with_history(
+            conversation,
+            api_key,
+            llm_name,
+            api_url,
+            use_responses_api=use_responses_api_openai,
+            llm_args=llm_args,
+        )
+
+
+async def aquery_llm(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+    ai_provider: str,
+    llm_args: Optional[dict] = None,
+) -> str:
+    """
+    Async counterpart of ``query_llm``: waits for the provider without blocking the event loop.
+    """
+    cache, key = _response_cache_entry(conversation, llm_name, ai_provider, llm_args)
+    if key is not None:
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+    response = await _acall_with_retries(
+        ai_provider,
+        lambda: _arate_limited(
+            ai_provider,
+            api_key,
+            conversation,
+            lambda: _aquery_provider(
+                conversation, api_key, llm_name, ai_provider, llm_args
+            ),
+        ),
+    )
+    if key is not None:
+        cache.put(key, response)
+    return response
+
+
+async def _aquery_provider(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+    ai_provider: str,
+    llm_args: Optional[dict] = None,
+) -> str:
+    if ai_provider == AIProviders.GOOGLE.value:
+        return await agenerate_response_with_history_google(
+            conversation, api_key, llm_name
+        )
+    elif ai_provider == AIProviders.ANTHROPIC.value:
+        return await agenerate_response_with_history_anthropic(
+            conversation, api_key, llm_name
+        )
+    elif ai_provider == AIProviders.COHERE.value:
+        return await agenerate_response_with_history_cohere(
+            conversation, api_key, llm_name
+        )
+    else:
+        api_url, use_responses_api_openai = _openai_compatible_api(ai_provider)
+        return await agenerate_response_with_history(
+            conversation,
+            api_key,
+            llm_name,
+            api_url,
+            use_responses_api=use_responses_api_openai,
+            llm_args=llm_args,
+        )
+
+
+def _openai_compatible_api(ai_provider: str) -> Tuple[str, bool]:
+    """Return the base URL of the provider and whether it uses OpenAI's Responses API."""
+    if ai_provider == AIProviders.DEEPINFRA.value:
+        return "https://api.deepinfra.com/v1/openai", False
+    elif ai_provider == AIProviders.OPENAI.value:
+        return "https://api.openai.com/v1", True
+    elif ai_provider == AIProviders.DEEPSEEK.value:
+        return "https://api.deepseek.com", False
+    elif ai_provider == AIProviders.MISTRAL_AI.value:
+        return "https://api.mistral.ai/v1", False
+    elif ai_provider == AIProviders.OPENROUTER.value:
+        return "https://openrouter.ai/api/v1", False
+    elif ai_provider == AIProviders.GROK.value:
+        return "https://api.x.ai/v1", False
+    raise UnsupportedProviderError(_user_message("unsupported"), retryable=False)
+
+
+# Extraction functions execute the generated code, which builds models through pm4py and powl and
+# shares their global state (e.g., id counters); extractions therefore run one at a time, whether
+# they run in the caller or in the background thread of a streamed generation.
+_extraction_lock = threading.Lock()
+
+
+def _extract(
+    extraction_function: Callable[[str, Any], T], response: str, auto_duplicate: bool
+) -> T:
+    with _extraction_lock:
+        return extraction_function(response, auto_duplicate)
+
+
 def generate_result_with_error_handling(
     conversation: List[dict[str:str]],
     extraction_function: Callable[[str, Any], T],
@@ -240,30 +881,145 @@ def generate_result_with_error_handling(
     max_iterations=5,
     additional_iterations=5,
     standard_error_message=ERROR_MESSAGE_FOR_MODEL_GENERATION,
+    stream: bool = False,
+    on_partial_response: Optional[Callable[[str], None]] = None,
 ) -> tuple[str, any, list[Any]]:
+    """
+    Query the LLM and extract the result from its response, sending extraction errors back to the
+    LLM until the extraction succeeds.
+
+    With ``stream``, responses are streamed: ``on_partial_response`` (if given) is called with the
+    response received so far, and the extraction of a python block starts as soon as its closing
+    fence arrives.
+    """
     error_history = []
     for iteration in range(max_iterations + additional_iterations):
-        response = query_llm(conversation, api_key, llm_name, ai_provider, llm_args)
+        auto_duplicate = iteration >= max_iterations
+        early_extraction = None
+        if stream:
+            response, early_extraction = _stream_with_early_extraction(
+                stream_llm(conversation, api_key, llm_name, ai_provider, llm_args),
+                extraction_function,
+                auto_duplicate,
+                on_partial_response,
+            )
+        else:
+            response = query_llm(conversation, api_key, llm_name, ai_provider, llm_args)
         try:
             conversation.append({"role": "assistant", "content": response})
-            auto_duplicate = iteration >= max_iterations
-            code, result = extraction_function(response, auto_duplicate)
+            if early_extraction is not None:
+                code, result = early_extraction.result()
+            else:
+                code, result = _extract(extraction_function, response, auto_duplicate)
             return code, result, conversation  # Break loop if execution is successful
         except Exception as e:
-            error_description = str(e)
-            error_history.append(error_description)
-            if constants.ENABLE_PRINTS:
-                print("Error detected in iteration " + str(iteration + 1))
-                print("\t" + error_description.replace("\n", " ").replace("\r", " "))
-            new_message = (
-                f"Executing your code led to an error! "
-                + standard_error_message
-                + "This is the error"
-                f" message: {error_description}"
+            _report_extraction_error(
+                conversation, error_history, iteration, e, standard_error_message
+            )
+
+    raise _repair_failed(llm_name, max_iterations, error_history)
+
+
+async def agenerate_result_with_error_handling(
+    conversation: List[dict[str:str]],
+    extraction_function: Callable[[str, Any], T],
+    api_key: str,
+    llm_name: str,
+    ai_provider: str,
+    llm_args: Optional[dict] = None,
+    max_iterations=5,
+    additional_iterations=5,
+    standard_error_message=ERROR_MESSAGE_FOR_MODEL_GENERATION,
+) -> tuple[str, any, list[Any]]:
+    """
+    Async counterpart of ``generate_result_with_error_handling``; the extraction function itself
+    runs on the event loop.
+    """
+    error_history = []
+    for iteration in range(max_iterations + additional_iterations):
+        response = await aquery_llm(
+            conversation, api_key, llm_name, ai_provider, llm_args
+        )
+        try:
+            conversation.append({"role": "assistant", "content": response})
+            auto_duplicate = iteration >= max_iterations
+            code, result = _extract(extraction_function, response, auto_duplicate)
+            return code, result, conversation
+        except Exception as e:
+            _report_extraction_error(
+                conversation, error_history, iteration, e, standard_error_message
             )
-            conversation.append({"role": "user", "content": new_message, "type": "error"})
 
-    raise Exception(
+    raise _repair_failed(llm_name, max_iterations, error_history)
+
+
+def _stream_with_early_extraction(
+    chunks: Iterator[str],
+    extraction_function: Callable[[str, Any], T],
+    auto_duplicate: bool,
+    on_partial_response: Optional[Callable[[str], None]],
+) -> Tuple[str, Optional[Future]]:
+    """
+    Collect a streamed response. Each time a python block is closed, the extraction function is
+    started in a background thread on the response up to that block, so the code is already
+    executed while the rest of the response (usually explanations) is streamed. The returned future
+    holds the extraction of the last python block, i.e., the final one of the complete response;
+    it is None if the response contains no python block.
+    """
+    response = ""
+    search_from = 0
+    extraction = None
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        for chunk in chunks:
+            response += chunk
+            if on_partial_response is not None:
+                on_partial_response(response)
+
+            block_end = search_from
+            for match in PYTHON_CODE_PATTERN.finditer(response, search_from):
+                block_end = match.end()
+            if block_end > search_from:
+                search_from = block_end
+                if extraction is not None:
+                    # superseded by a later python block
+                    extraction.cancel()
+                extraction = executor.submit(
+                    _extract, extraction_function, response[:block_end], auto_duplicate
+                )
+    except BaseException:
+        # the response is incomplete: drop the extractions that have not started yet
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown(wait=False)
+    return response, extraction
+
+
+def _report_extraction_error(
+    conversation: List[dict[str, str]],
+    error_history: List[str],
+    iteration: int,
+    error: Exception,
+    standard_error_message: str,
+) -> None:
+    error_description = str(error)
+    error_history.append(error_description)
+    if constants.ENABLE_PRINTS:
+        print("Error detected in iteration " + str(iteration + 1))
+        print("\t" + error_description.replace("\n", " ").replace("\r", " "))
+    new_message = (
+        f"Executing your code led to an error! "
+        + standard_error_message
+        + "This is the error"
+        f" message: {error_description}"
+    )
+    conversation.append({"role": "user", "content": new_message, "type": "error"})
+
+
+def _repair_failed(
+    llm_name: str, max_iterations: int, error_history: List[str]
+) -> Exception:
+    return Exception(
         llm_name
         + " failed to fix the errors after "
         + str(max_iterations + 5)
@@ -294,6 +1050,56 @@ def generate_response_with_history(
     """
     Generates a response from the LLM using the conversation history.
     """
+    url, headers, payload = _openai_request(
+        conversation_history, api_key, llm_name, api_url, use_responses_api, llm_args
+    )
+    data = _requests_post(url, headers=headers, json_=payload, timeout_s=(3.05, 120))
+    return _openai_response_text(data, use_responses_api)
+
+
+async def agenerate_response_with_history(
+    conversation_history: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+    api_url: str,
+    use_responses_api: bool = False,
+    llm_args: Optional[dict] = None,
+) -> str:
+    url, headers, payload = _openai_request(
+        conversation_history, api_key, llm_name, api_url, use_responses_api, llm_args
+    )
+    data = await _httpx_post(url, headers=headers, json_=payload, timeout_s=(3.05, 120))
+    return _openai_response_text(data, use_responses_api)
+
+
+def stream_response_with_history(
+    conversation_history: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+    api_url: str,
+    use_responses_api: bool = False,
+    llm_args: Optional[dict] = None,
+) -> Iterator[str]:
+    url, headers, payload = _openai_request(
+        conversation_history, api_key, llm_name, api_url, use_responses_api, llm_args
+    )
+    payload["stream"] = True
+    for event in _requests_stream_events(
+        url, headers=headers, json_=payload, timeout_s=(3.05, 120)
+    ):
+        text = _openai_stream_text(event, use_responses_api)
+        if text:
+            yield text
+
+
+def _openai_request(
+    conversation_history: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+    api_url: str,
+    use_responses_api: bool,
+    llm_args: Optional[dict],
+) -> Tuple[str, dict, dict]:
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {api_key}"
@@ -316,18 +1122,23 @@ def generate_response_with_history(
 
     api_url = api_url.rstrip("/")
     url = f"{api_url}{endpoint}"
+    return url, headers, payload
 
-    data = _requests_post(url, headers=headers, json_=payload, timeout_s=(3.05, 120))
 
-    if isinstance(data, dict) and data.get("error"):
+def _check_provider_error(error) -> None:
+    if error:
         logger.warning(
-            "Provider returned error object with 200: %s",
-            _redact(str(data.get("error"))),
+            "Provider returned error object with 200: %s", _redact(str(error))
         )
         raise ServiceUnavailableError(
-            _user_message("unavailable"), retryable=True, details=str(data.get("error"))
+            _user_message("unavailable"), retryable=False, details=str(error)
         )
 
+
+def _openai_response_text(data: dict, use_responses_api: bool) -> str:
+    if isinstance(data, dict):
+        _check_provider_error(data.get("error"))
+
     try:
         if use_responses_api:
             return data["output"][-1]["content"][0]["text"]
@@ -336,10 +1147,26 @@ def generate_response_with_history(
     except (KeyError, TypeError) as e:
         logger.warning("Unexpected schema from provider: %s", _redact(str(data))[:1000])
         raise UnexpectedResponseError(
-            _user_message("unexpected"), retryable=True, details=str(e)
+            _user_message("unexpected"), retryable=False, details=str(e)
         )
 
 
+def _openai_stream_text(event: dict, use_responses_api: bool) -> Optional[str]:
+    _check_provider_error(event.get("error"))
+    if use_responses_api:
+        event_type = event.get("type")
+        if event_type in ("error", "response.failed"):
+            _check_provider_error(event.get("message") or event)
+        if event_type == "response.output_text.delta":
+            return event.get("delta")
+        return None
+
+    choices = event.get("choices") or []
+    if not choices:
+        return None
+    return (choices[0].get("delta") or {}).get("content")
+
+
 # -----------------------------------------------------------------------------
 # Google (Gemini)
 # -----------------------------------------------------------------------------
@@ -364,6 +1191,21 @@ def _to_gemini_contents_and_system(
     return system_instruction, contents
 
 
+def _google_request(
+    conversation_history: List[dict[str, str]], api_key: str, google_model: str
+) -> dict:
+    if not api_key:
+        raise Exception("api key not provided")
+
+    system_instruction, contents = _to_gemini_contents_and_system(
+        conversation_history
+    )
+    request = {"model": google_model, "contents": contents}
+    if system_instruction:
+        request["config"] = {"system_instruction": system_instruction}
+    return request
+
+
 def generate_response_with_history_google(
     conversation_history: List[dict[str, str]],
     api_key: str,
@@ -371,103 +1213,207 @@ def generate_response_with_history_google(
 ) -> str:
     try:
         api_key = api_key.strip()
-        if not api_key:
-            raise Exception("api key not provided")
-        
-        client = genai.Client(api_key=api_key)
-
-        system_instruction, contents = _to_gemini_contents_and_system(
-            conversation_history
+        request = _google_request(conversation_history, api_key, google_model)
+        client = _get_client(
+            AIProviders.GOOGLE.value, api_key, lambda: genai.Client(api_key=api_key)
         )
+        return _google_response_text(client.models.generate_content(**request))
+    except Exception as e:
+        raise _google_error(e)
 
-        response = client.models.generate_content(
-                model = google_model, contents = contents, system_instruction=system_instruction
-            ) if system_instruction else client.models.generate_content(
-                model = google_model, contents = contents
-            )
 
-        try:
-            return response.text  # type: ignore[attr-defined]
-        except Exception:
-            if hasattr(response, "candidates") and response.candidates:
-                cand = response.candidates[0]
-                parts = getattr(cand, "content", None)
-                if parts and getattr(parts, "parts", None):
-                    texts = [
-                        getattr(p, "text", "")
-                        for p in parts.parts
-                        if getattr(p, "text", "")
-                    ]
-                    if texts:
-                        return "\n".join(texts)
-            raise UnexpectedResponseError(_user_message("unexpected"), retryable=True)
+async def agenerate_response_with_history_google(
+    conversation_history: List[dict[str, str]],
+    api_key: str,
+    google_model: str,
+) -> str:
+    try:
+        api_key = api_key.strip()
+        request = _google_request(conversation_history, api_key, google_model)
+        async with _async_client(
+            AIProviders.GOOGLE.value,
+            api_key,
+            lambda: genai.Client(api_key=api_key).aio,
+        ) as client:
+            response = await client.models.generate_content(**request)
+        return _google_response_text(response)
+    except Exception as e:
+        raise _google_error(e)
+
 
+def stream_response_with_history_google(
+    conversation_history: List[dict[str, str]],
+    api_key: str,
+    google_model: str,
+) -> Iterator[str]:
+    try:
+        api_key = api_key.strip()
+        request = _google_request(conversation_history, api_key, google_model)
+        client = _get_client(
+            AIProviders.GOOGLE.value, api_key, lambda: genai.Client(api_key=api_key)
+        )
+        for chunk in client.models.generate_content_stream(**request):
+            text = chunk.text
+            if text:
+                yield text
     except Exception as e:
-        text = str(e)
-        lower = text.lower()
-        if "api key" in lower or "permission" in lower or "unauthorized" in lower:
-            raise AuthError(_user_message("auth"), retryable=False, details=text)
-        if "rate " in lower or "exceeded" in lower or "quota " in lower:
-            raise RateLimitError(
-                _user_message("rate_limit"), retryable=True, details=text
-            )
-        if "timeout" in lower or "timed out" in lower:
-            raise TimeoutError(_user_message("timeout"), retryable=True, details=text)
-        if "not found" in lower or (
-            "model" in lower and ("not" in lower or "unknown" in lower)
-        ):
-            raise BadRequestError(
-                _user_message("bad_request"), retryable=False, details=text
-            )
+        raise _google_error(e)
 
-        logger.error("Google provider error: %s", _redact(text))
-        raise ServiceUnavailableError(
-            _user_message("unavailable"), retryable=True, details=text
+
+def _google_response_text(response) -> str:
+    try:
+        return response.text  # type: ignore[attr-defined]
+    except Exception:
+        if hasattr(response, "candidates") and response.candidates:
+            cand = response.candidates[0]
+            parts = getattr(cand, "content", None)
+            if parts and getattr(parts, "parts", None):
+                texts = [
+                    getattr(p, "text", "")
+                    for p in parts.parts
+                    if getattr(p, "text", "")
+                ]
+                if texts:
+                    return "\n".join(texts)
+        raise UnexpectedResponseError(_user_message("unexpected"), retryable=False)
+
+
+def _google_error(e: Exception) -> BaseLLMError:
+    text = str(e)
+    lower = text.lower()
+    if "api key" in lower or "permission" in lower or "unauthorized" in lower:
+        return AuthError(_user_message("auth"), retryable=False, details=text)
+    if "rate " in lower or "exceeded" in lower or "quota " in lower:
+        return RateLimitError(
+            _user_message("rate_limit"),
+            retryable=True,
+            details=text,
+            retry_after=_retry_after(getattr(e, "response", None)),
         )
+    if "timeout" in lower or "timed out" in lower:
+        return TimeoutError(_user_message("timeout"), retryable=True, details=text)
+    if "not found" in lower or (
+        "model" in lower and ("not" in lower or "unknown" in lower)
+    ):
+        return BadRequestError(
+            _user_message("bad_request"), retryable=False, details=text
+        )
+
+    logger.error("Google provider error: %s", _redact(text))
+    return ServiceUnavailableError(
+        _user_message("unavailable"),
+        retryable=_is_server_or_connection_error(e),
+        details=text,
+    )
 
 
 # -----------------------------------------------------------------------------
 # Anthropic
 # -----------------------------------------------------------------------------
-def generate_response_with_history_anthropic(
-    conversation: List[dict[str, str]],
-    api_key: str,
-    llm_name: str,
-) -> str:
+def _import_anthropic():
     try:
         import anthropic
     except Exception as e:
         raise ProviderMismatchError(
             _user_message("provider_mismatch"), retryable=False, details=str(e)
         )
+    return anthropic
 
+
+def generate_response_with_history_anthropic(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+) -> str:
+    anthropic = _import_anthropic()
     try:
-        client = anthropic.Anthropic(api_key=api_key)
+        client = _get_client(
+            AIProviders.ANTHROPIC.value,
+            api_key,
+            lambda: anthropic.Anthropic(api_key=api_key, max_retries=0),
+        )
         message = client.messages.create(
             model=llm_name,
             max_tokens=8192,
             messages=conversation,
         )
         return message.content[0].text  # type: ignore[index]
-    except anthropic.RateLimitError as e:
-        raise RateLimitError(
-            _user_message("rate_limit"), retryable=True, details=str(e)
-        )
-    except anthropic.AuthenticationError as e:
-        raise AuthError(_user_message("auth"), retryable=False, details=str(e))
-    except anthropic.APIStatusError as e:
-        logger.warning("Anthropic APIStatusError: %s", _redact(str(e)))
-        raise ServiceUnavailableError(
-            _user_message("unavailable"), retryable=True, details=str(e)
+    except Exception as e:
+        raise _anthropic_error(anthropic, e)
+
+
+async def agenerate_response_with_history_anthropic(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+) -> str:
+    anthropic = _import_anthropic()
+    try:
+        async with _async_client(
+            AIProviders.ANTHROPIC.value,
+            api_key,
+            lambda: anthropic.AsyncAnthropic(api_key=api_key, max_retries=0),
+        ) as client:
+            message = await client.messages.create(
+                model=llm_name,
+                max_tokens=8192,
+                messages=conversation,
+            )
+        return message.content[0].text  # type: ignore[index]
+    except Exception as e:
+        raise _anthropic_error(anthropic, e)
+
+
+def stream_response_with_history_anthropic(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+) -> Iterator[str]:
+    anthropic = _import_anthropic()
+    try:
+        client = _get_client(
+            AIProviders.ANTHROPIC.value,
+            api_key,
+            lambda: anthropic.Anthropic(api_key=api_key, max_retries=0),
         )
+        with client.messages.stream(
+            model=llm_name,
+            max_tokens=8192,
+            messages=conversation,
+        ) as stream:
+            yield from stream.text_stream
     except Exception as e:
-        text = str(e)
-        if "timeout" in text.lower():
-            raise TimeoutError(_user_message("timeout"), retryable=True, details=text)
-        logger.exception("Anthropic provider error: %s", _redact(text))
-        raise ServiceUnavailableError(
-            _user_message("unavailable"), retryable=True, details=text
+        raise _anthropic_error(anthropic, e)
+
+
+def _anthropic_error(anthropic, e: Exception) -> BaseLLMError:
+    if isinstance(e, anthropic.RateLimitError):
+        return RateLimitError(
+            _user_message("rate_limit"),
+            retryable=True,
+            details=str(e),
+            retry_after=_retry_after(e.response),
+        )
+    if isinstance(e, anthropic.AuthenticationError):
+        return AuthError(_user_message("auth"), retryable=False, details=str(e))
+    if isinstance(e, anthropic.APIStatusError):
+        logger.warning("Anthropic APIStatusError: %s", _redact(str(e)))
+        return ServiceUnavailableError(
+            _user_message("unavailable"),
+            retryable=e.status_code >= 500,
+            details=str(e),
+            retry_after=_retry_after(e.response),
         )
+    text = str(e)
+    if isinstance(e, anthropic.APITimeoutError) or "timeout" in text.lower():
+        return TimeoutError(_user_message("timeout"), retryable=True, details=text)
+    logger.exception("Anthropic provider error: %s", _redact(text))
+    return ServiceUnavailableError(
+        _user_message("unavailable"),
+        retryable=isinstance(e, anthropic.APIConnectionError)
+        or _is_server_or_connection_error(e),
+        details=text,
+    )
 
 
 # -----------------------------------------------------------------------------
@@ -479,24 +1425,75 @@ def generate_response_with_history_cohere(
     llm_name: str,
 ) -> str:
     try:
-        client = cohere.ClientV2(api_key)
+        client = _get_client(
+            AIProviders.COHERE.value,
+            api_key,
+            lambda: cohere.ClientV2(api_key, max_retries=0),
+        )
         response = client.chat(model=llm_name, messages=conversation)
     except Exception as e:
-        text = str(e)
-        lower = text.lower()
-        if "invalid api key" in lower or "unauthorized" in lower:
-            raise AuthError(_user_message("auth"), retryable=False, details=text)
-        if "rate" in lower or "quota" in lower:
-            raise RateLimitError(
-                _user_message("rate_limit"), retryable=True, details=text
-            )
-        if "timeout" in lower or "timed out" in lower:
-            raise TimeoutError(_user_message("timeout"), retryable=True, details=text)
-        logger.error("Cohere provider error: %s", _redact(text))
-        raise ServiceUnavailableError(
-            _user_message("unavailable"), retryable=True, details=text
+        raise _cohere_error(e)
+    return _cohere_response_text(response)
+
+
+async def agenerate_response_with_history_cohere(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+) -> str:
+    try:
+        async with _async_client(
+            AIProviders.COHERE.value,
+            api_key,
+            lambda: cohere.AsyncClientV2(api_key, max_retries=0),
+        ) as client:
+            response = await client.chat(model=llm_name, messages=conversation)
+    except Exception as e:
+        raise _cohere_error(e)
+    return _cohere_response_text(response)
+
+
+def stream_response_with_history_cohere(
+    conversation: List[dict[str, str]],
+    api_key: str,
+    llm_name: str,
+) -> Iterator[str]:
+    try:
+        client = _get_client(
+            AIProviders.COHERE.value,
+            api_key,
+            lambda: cohere.ClientV2(api_key, max_retries=0),
+        )
+        for event in client.chat_stream(model=llm_name, messages=conversation):
+            if event.type == "content-delta":
+                yield event.delta.message.content.text
+    except Exception as e:
+        raise _cohere_error(e)
+
+
+def _cohere_error(e: Exception) -> BaseLLMError:
+    text = str(e)
+    lower = text.lower()
+    if "invalid api key" in lower or "unauthorized" in lower:
+        return AuthError(_user_message("auth"), retryable=False, details=text)
+    if getattr(e, "status_code", None) == 429 or "rate" in lower or "quota" in lower:
+        return RateLimitError(
+            _user_message("rate_limit"),
+            retryable=True,
+            details=text,
+            retry_after=_retry_after(e),
         )
+    if "timeout" in lower or "timed out" in lower:
+        return TimeoutError(_user_message("timeout"), retryable=True, details=text)
+    logger.error("Cohere provider error: %s", _redact(text))
+    return ServiceUnavailableError(
+        _user_message("unavailable"),
+        retryable=_is_server_or_connection_error(e),
+        details=text,
+    )
+
 
+def _cohere_response_text(response) -> str:
     try:
         return response.message.content[0].text  # type: ignore[attr-defined,index]
     except Exception as e:
@@ -504,5 +1501,5 @@ def generate_response_with_history_cohere(
             "Unexpected schema from Cohere: %s", _redact(str(response))[:1000]
         )
         raise UnexpectedResponseError(
-            _user_message("unexpected"), retryable=True, details=str(e)
+            _user_message("unexpected"), retryable=False, details=str(e)
         )
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Union
+
+
+def estimate_tokens(text: str) -> int:
+    # about four characters per token for English text and code
+    return len(text) // 4 + 1
+
+
+class _TokenBucket:
+    """
+    Bucket refilled continuously with ``per_minute`` tokens per minute, up to ``per_minute``.
+
+    Callers reserve their tokens right away and then wait until the reservation is covered, so the
+    bucket works the same for threads and async tasks and serves them in order.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take the tokens and return the seconds to wait until they are available."""
+        with self._lock:
+            self._refill()
+            # a reservation larger than the bucket would never be covered
+            self.level -= min(amount, self.capacity)
+            return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def consume(self, amount: float):
+        """Take tokens that were already used; later reservations wait for them."""
+        with self._lock:
+            self._refill()
+            self.level -= amount
+
+
+class _ConcurrencyLimit:
+    """
+    Semaphore that threads and async tasks (of any event loop) can wait on together; a released
+    slot is handed over to the longest waiting caller.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.available = max_concurrency
+        self._waiters: deque[
+            Union[threading.Event, tuple[asyncio.AbstractEventLoop, asyncio.Future]]
+        ] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.available > 0 and not self._waiters:
+                self.available -= 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.available > 0 and not self._waiters:
+                self.available -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        future = waiter[1]
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                handed_over = waiter not in self._waiters
+                if not handed_over:
+                    self._waiters.remove(waiter)
+            if handed_over:
+                if future.done() and not future.cancelled():
+                    self.release()
+                else:
+                    # _wake passes the slot on when it finds the future cancelled
+                    future.cancel()
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self.available += 1
+                return
+            waiter = self._waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+            return
+        loop, future = waiter
+        try:
+            loop.call_soon_threadsafe(self._wake, future)
+        except RuntimeError:
+            # the loop of the waiter is closed
+            self.release()
+
+    def _wake(self, future: asyncio.Future):
+        if future.done():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class RateLimiter:
+    """
+    Limits the requests to a provider made with one API key: at most ``requests_per_minute``
+    requests and ``tokens_per_minute`` (estimated) prompt and response tokens per minute, and at
+    most ``max_concurrency`` requests in flight. None means unlimited. The limiter is shared by all
+    threads and async tasks of the process.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.requests = _TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = _TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = _ConcurrencyLimit(max_concurrency) if max_concurrency else None
+
+    def _reserve(self, prompt_tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(prompt_tokens))
+        return wait
+
+    @contextmanager
+    def slot(self, prompt_tokens: int):
+        """Wait until a request with the given number of prompt tokens may be sent."""
+        wait = self._reserve(prompt_tokens)
+        if wait > 0:
+            time.sleep(wait)
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        try:
+            yield
+        finally:
+            if self.concurrency is not None:
+                self.concurrency.release()
+
+    @asynccontextmanager
+    async def aslot(self, prompt_tokens: int):
+        """Async counterpart of ``slot``."""
+        wait = self._reserve(prompt_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if self.concurrency is not None:
+            await self.concurrency.aacquire()
+        try:
+            yield
+        finally:
+            if self.concurrency is not None:
+                self.concurrency.release()
+
+    def record_response_tokens(self, tokens: int):
+        if self.tokens is not None:
+            self.tokens.consume(tokens)
+
+
+_rate_limits: dict[str, dict] = {}
+_limiters: dict[tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def set_rate_limit(
+    ai_provider: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+) -> None:
+    """
+    Limit the requests to the provider, separately for each API key (see ``RateLimiter``); without
+    any limit, the requests to the provider are not limited anymore.
+    """
+    limits = {
+        "requests_per_minute": requests_per_minute,
+        "tokens_per_minute": tokens_per_minute,
+        "max_concurrency": max_concurrency,
+    }
+    with _limiters_lock:
+        if any(limits.values()):
+            _rate_limits[ai_provider] = limits
+        else:
+            _rate_limits.pop(ai_provider, None)
+        for key in [key for key in _limiters if key[0] == ai_provider]:
+            del _limiters[key]
+
+
+def get_rate_limiter(ai_provider: str, api_key: str) -> Optional[RateLimiter]:
+    with _limiters_lock:
+        limits = _rate_limits.get(ai_provider)
+        if limits is None:
+            return None
+        key = (ai_provider, hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = RateLimiter(**limits)
+        return limiter
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional
+
+# llm_args that make the provider sample; a request setting one of them to a value other than the
+# neutral one is considered non-deterministic
+SAMPLING_ARGS = {"temperature": 0, "top_p": 1, "n": 1}
+
+
+def request_key(
+    conversation: List[dict],
+    llm_name: str,
+    ai_provider: str,
+    llm_args: Optional[dict] = None,
+) -> str:
+    """Stable hash of a request: provider, model, llm_args, and the full message list."""
+    request = {
+        "provider": ai_provider,
+        "model": llm_name,
+        "llm_args": llm_args or {},
+        "messages": conversation,
+    }
+    content = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def is_sampled(llm_args: Optional[dict]) -> bool:
+    return any(
+        key in (llm_args or {}) and llm_args[key] != neutral
+        for key, neutral in SAMPLING_ARGS.items()
+    )
+
+
+class ResponseCache(ABC):
+    """
+    Base class of the response caches in front of ``query_llm`` (see ``set_response_cache``).
+
+    Entries expire ``ttl_s`` seconds after they were stored (never if None), and the least recently
+    used entries are evicted beyond ``max_entries``. Requests whose ``llm_args`` explicitly enable
+    sampling (e.g., a temperature above 0) bypass the cache unless ``cache_sampled`` is set.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_s: Optional[float] = None,
+        cache_sampled: bool = False,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.cache_sampled = cache_sampled
+
+    def accepts(self, llm_args: Optional[dict]) -> bool:
+        return self.cache_sampled or not is_sampled(llm_args)
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_s is not None and time.time() - created > self.ttl_s
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def put(self, key: str, response: str):
+        pass
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-memory LRU cache of responses, shared by the threads of the process."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_s: Optional[float] = None,
+        cache_sampled: bool = False,
+    ):
+        super().__init__(max_entries, ttl_s, cache_sampled)
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, created = entry
+            if self._expired(created):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: str):
+        with self._lock:
+            self._entries[key] = (response, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk cache of responses in a SQLite database, which can be shared by several processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        ttl_s: Optional[float] = None,
+        cache_sampled: bool = False,
+    ):
+        super().__init__(max_entries, ttl_s, cache_sampled)
+        self._lock = threading.Lock()
+        # autocommit; the connection is shared by the threads of the process under the lock
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created = row
+            if self._expired(created):
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            return response
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            if self.ttl_s is not None:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE created < ?", (now - self.ttl_s,)
+                )
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses"
+                " ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
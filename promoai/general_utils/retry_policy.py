@@ -0,0 +1,81 @@
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header (delay in seconds or HTTP date)."""
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    Retry policy for retryable transport errors (rate limits, unavailable services, timeouts).
+
+    The n-th retry waits ``base_delay_s * 2 ** (n - 1)`` seconds (at most ``max_delay_s``), reduced
+    by a random fraction of up to ``jitter``; a Retry-After sent by the provider is used instead,
+    unless it exceeds ``max_delay_s``, in which case the error is raised right away. Each provider
+    may retry at most ``budget`` times per ``budget_window_s`` seconds across all threads and tasks,
+    so an outage does not multiply the load on the provider.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay_s: float = 1.0,
+        max_delay_s: float = 30.0,
+        jitter: float = 0.5,
+        budget: int = 20,
+        budget_window_s: float = 60.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.jitter = jitter
+        self.budget = budget
+        self.budget_window_s = budget_window_s
+        self._retries: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def backoff(
+        self, retry: int, retry_after: Optional[float] = None
+    ) -> Optional[float]:
+        """Seconds to wait before the given retry (1 for the first one), or None to give up."""
+        if retry >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            if retry_after > self.max_delay_s:
+                return None
+            # a little jitter, so the waiting clients do not come back at the same instant
+            return retry_after + random.uniform(0, self.jitter * self.base_delay_s)
+        delay = min(self.max_delay_s, self.base_delay_s * 2 ** (retry - 1))
+        return delay * (1 - random.uniform(0, self.jitter))
+
+    def consume_budget(self, provider: str) -> bool:
+        """Record a retry against the provider, unless its budget is exhausted."""
+        now = time.monotonic()
+        with self._lock:
+            retries = self._retries.setdefault(provider, deque())
+            while retries and now - retries[0] > self.budget_window_s:
+                retries.popleft()
+            if len(retries) >= self.budget:
+                return False
+            retries.append(now)
+            return True
@@ -1,34 +1,92 @@
+from typing import Callable, Optional
+
 from pm4py import BPMN, convert_to_petri_net, PetriNet
-from powl.main import discover as discover_powl
+from powl.main import discover as discover_powl, import_event_log
 
 from promoai.aipa.bpmn_analyzer import BPMNAnalyzer
+from promoai.discovery.columnar_import import COLUMNAR_EXTENSIONS, read_event_table
+from promoai.discovery.dfg_discovery import discover_powl_from_dfg
+from promoai.discovery.discovery_cache import DiscoveryCache, log_fingerprint
+from promoai.discovery.parallel_variants import discover_variants_parallel
+from promoai.discovery.variant_discovery import discover_powl_from_variants
+from promoai.discovery.xes_streaming import discover_dfg_from_xes
 from promoai.model_generation.llm_model_generator import LLMProcessModelGenerator
+from promoai.pn_to_powl.conversion_cache import ConversionCache
 from promoai.pn_to_powl.converter import convert_workflow_net_to_powl
 
 
 def generate_model_from_text(
     description: str, api_key: str, ai_model: str, ai_provider: str, resource_aware_discovery : bool = False,
-    llm_args: dict = None,
+    llm_args: dict = None, stream: bool = False, on_partial_response: Callable[[str], None] = None,
 ):
     return LLMProcessModelGenerator.from_description(
         description, api_key, ai_model, ai_provider, resource_aware_discovery=resource_aware_discovery,
-        llm_args=llm_args
+        llm_args=llm_args, stream=stream, on_partial_response=on_partial_response
     )
 
 
-def generate_model_from_event_log(event_log, threshold=0.0):
-    powl_model = discover_powl(event_log, dfg_frequency_filtering_threshold=threshold)
+def generate_model_from_event_log(
+    event_log,
+    threshold=0.0,
+    streaming=False,
+    workers: Optional[int] = None,
+    cache: Optional[DiscoveryCache] = None,
+):
+    if streaming:
+        # event_log is the path of an XES/XES.GZ file that is parsed incrementally; the model is
+        # discovered from the directly-follows counts only
+        key = log_fingerprint(event_log) + "-streamed" if cache is not None else None
+        dfg = cache.get(key) if cache is not None else None
+        if dfg is None:
+            dfg = discover_dfg_from_xes(event_log)
+            if cache is not None:
+                cache.put(key, dfg)
+        powl_model = discover_powl_from_dfg(dfg, threshold)
+        return LLMProcessModelGenerator.from_powl(powl_model=powl_model)
+
+    if cache is None and workers is None:
+        if isinstance(event_log, str):
+            event_log = _load_event_log(event_log)
+        powl_model = discover_powl(
+            event_log, dfg_frequency_filtering_threshold=threshold
+        )
+        return LLMProcessModelGenerator.from_powl(powl_model=powl_model)
+
+    # the trace variants of the log (collected by worker processes, or reused across thresholds
+    # from the cache) are mined with the same algorithm as the log, so the model is the same
+    key = log_fingerprint(event_log) + "-variants" if cache is not None else None
+    variants = cache.get_variants(key) if cache is not None else None
+    if variants is None:
+        if isinstance(event_log, str):
+            event_log = _load_event_log(event_log)
+        variants = discover_variants_parallel(event_log, workers=workers)
+        if cache is not None:
+            cache.put_variants(key, variants)
+    powl_model = discover_powl_from_variants(variants, threshold)
     return LLMProcessModelGenerator.from_powl(powl_model=powl_model)
 
 
-def generate_model_from_petri_net(pn: PetriNet):
-    powl_model = convert_workflow_net_to_powl(pn)
+def _load_event_log(file_path: str):
+    if file_path.lower().endswith(COLUMNAR_EXTENSIONS):
+        return read_event_table(file_path)
+    return import_event_log(file_path)
+
+
+def generate_model_from_petri_net(
+    pn: PetriNet, cache: Optional[ConversionCache] = None
+):
+    if cache is None:
+        powl_model = convert_workflow_net_to_powl(pn)
+    else:
+        powl_model = cache.convert(pn)
     return LLMProcessModelGenerator.from_powl(powl_model=powl_model)
 
 
-def generate_model_from_bpmn(bpmn_diagram: BPMN):
+def generate_model_from_bpmn(
+    bpmn_diagram: BPMN, cache: Optional[ConversionCache] = None
+):
     pn, im, fm = convert_to_petri_net(bpmn_diagram)
-    return generate_model_from_petri_net(pn)
+    return generate_model_from_petri_net(pn, cache=cache)
 
 
 def query_bpmn(
@@ -2,9 +2,10 @@ import re
 import traceback
 import ast
 
+PYTHON_CODE_PATTERN = re.compile(r"```python(.*?)```", re.DOTALL)
+
 
 def extract_final_python_code(response_text):
-    python_code_pattern = r"```python(.*?)```"
     allowed_import_path = "promoai.model_generation.generator"
     allowed_import_class = "ModelGenerator"
     any_import_pattern = r"^\s*(from\s+\S+\s+import\s+\S+|import\s+\S+)"
@@ -20,7 +21,7 @@ def extract_final_python_code(response_text):
         + r")\s*$"
     )
 
-    matches = re.findall(python_code_pattern, response_text, re.DOTALL)
+    matches = PYTHON_CODE_PATTERN.findall(response_text)
 
     if matches:
         python_snippet = matches[-1].strip()
@@ -1,3 +1,5 @@
+from typing import Callable
+
 import pm4py
 from pm4py.util import constants
 from powl import convert_to_bpmn, convert_to_petri_net, view as view_powl
@@ -5,7 +7,7 @@ from powl import convert_to_bpmn, convert_to_petri_net, view as view_powl
 from powl.objects.obj import POWL
 
 from promoai.model_generation import code_extraction
-from promoai.model_generation.model_generation import generate_model
+from promoai.model_generation.model_generation import agenerate_model, generate_model
 
 from promoai.pn_to_powl.converter_utils.powl_to_code import translate_powl_to_code
 from promoai.prompting import create_conversation, update_conversation
@@ -19,7 +21,7 @@ class LLMProcessModelGenerator:
     @classmethod
     def from_description(
         cls, process_description: str, api_key: str, ai_model: str, ai_provider: str, resource_aware_discovery: bool = False,
-        llm_args: dict = None,
+        llm_args: dict = None, stream: bool = False, on_partial_response: Callable[[str], None] = None,
     ):
         init_conversation = create_conversation(process_description, resource_aware_discovery=resource_aware_discovery)
         code, process_model, conversation = generate_model(
@@ -28,6 +30,23 @@ class LLMProcessModelGenerator:
             llm_name=ai_model,
             ai_provider=ai_provider,
             llm_args=llm_args,
+            stream=stream,
+            on_partial_response=on_partial_response,
+        )
+        return cls(process_model, conversation)
+
+    @classmethod
+    async def afrom_description(
+        cls, process_description: str, api_key: str, ai_model: str, ai_provider: str, resource_aware_discovery: bool = False,
+        llm_args: dict = None,
+    ):
+        init_conversation = create_conversation(process_description, resource_aware_discovery=resource_aware_discovery)
+        code, process_model, conversation = await agenerate_model(
+            init_conversation,
+            api_key=api_key,
+            llm_name=ai_model,
+            ai_provider=ai_provider,
+            llm_args=llm_args,
         )
         return cls(process_model, conversation)
 
@@ -62,7 +81,10 @@ class LLMProcessModelGenerator:
         bpmn_model = convert_to_bpmn(self.process_model)
         return bpmn_model
 
-    def update(self, feedback: str, api_key: str, ai_model: str, ai_provider: str, llm_args: dict = None):
+    def update(
+        self, feedback: str, api_key: str, ai_model: str, ai_provider: str, llm_args: dict = None,
+        stream: bool = False, on_partial_response: Callable[[str], None] = None,
+    ):
         self.conversation = update_conversation(self.conversation, feedback)
         code, self.process_model, self.conversation = generate_model(
             conversation=self.conversation,
@@ -70,6 +92,19 @@ class LLMProcessModelGenerator:
             llm_name=ai_model,
             ai_provider=ai_provider,
             llm_args=llm_args,
+            stream=stream,
+            on_partial_response=on_partial_response,
+        )
+        self.process_model = self.process_model.simplify()
+
+    async def aupdate(self, feedback: str, api_key: str, ai_model: str, ai_provider: str, llm_args: dict = None):
+        self.conversation = update_conversation(self.conversation, feedback)
+        code, self.process_model, self.conversation = await agenerate_model(
+            conversation=self.conversation,
+            api_key=api_key,
+            llm_name=ai_model,
+            ai_provider=ai_provider,
+            llm_args=llm_args,
         )
         self.process_model = self.process_model.simplify()
 
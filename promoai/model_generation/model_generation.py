@@ -1,8 +1,11 @@
-from typing import Any, List
+from typing import Any, Callable, List, Optional
 
 from powl.objects.obj import POWL
 
-from promoai.general_utils.llm_connection import generate_result_with_error_handling
+from promoai.general_utils.llm_connection import (
+    agenerate_result_with_error_handling,
+    generate_result_with_error_handling,
+)
 from promoai.model_generation.code_extraction import (
     execute_code_and_get_variable,
     extract_final_python_code,
@@ -36,6 +39,8 @@ def generate_model(
     llm_args: dict = None,
     max_iterations=10,
     additional_iterations=5,
+    stream: bool = False,
+    on_partial_response: Optional[Callable[[str], None]] = None,
 ) -> tuple[str, POWL, list[Any]]:
     return generate_result_with_error_handling(
         conversation=conversation,
@@ -46,4 +51,27 @@ def generate_model(
         llm_args=llm_args,
         max_iterations=max_iterations,
         additional_iterations=additional_iterations,
+        stream=stream,
+        on_partial_response=on_partial_response,
+    )
+
+
+async def agenerate_model(
+    conversation: List[dict[str:str]],
+    api_key: str,
+    llm_name: str,
+    ai_provider: str,
+    llm_args: dict = None,
+    max_iterations=10,
+    additional_iterations=5,
+) -> tuple[str, POWL, list[Any]]:
+    return await agenerate_result_with_error_handling(
+        conversation=conversation,
+        extraction_function=extract_model_from_response,
+        api_key=api_key,
+        llm_name=llm_name,
+        ai_provider=ai_provider,
+        llm_args=llm_args,
+        max_iterations=max_iterations,
+        additional_iterations=additional_iterations,
     )
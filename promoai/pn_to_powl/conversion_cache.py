@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+from typing import Optional
+
+from pm4py import PetriNet
+from powl.objects.obj import POWL
+
+from promoai.pn_to_powl.converter import convert_workflow_net_to_powl
+from promoai.pn_to_powl.converter_utils.net_hashing import (
+    canonical_net_hash,
+    net_structure,
+    same_structure,
+)
+from promoai.pn_to_powl.converter_utils.powl_encoding import decode_powl, encode_powl
+
+# bump when the converter output changes, so stale entries are not reused
+CACHE_VERSION = "4"
+
+
+class ConversionCache:
+    """
+    On-disk cache of Petri net to POWL conversions.
+
+    Entries are keyed by the canonical structural hash of the net and store a JSON encoding of the
+    converted model (data only, never code to execute), so re-uploading the same model (even with renamed nodes) skips the conversion.
+    Each entry also stores the labelled structure of its net, and a hit is only used if the net is
+    isomorphic to it, since different nets can share a hash.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.join(directory, "v" + CACHE_VERSION)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str, structure: dict) -> Optional[POWL]:
+        """Return the cached model of the net with the given structure, if any."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if not same_structure(entry["net"], structure):
+                return None
+            return decode_powl(entry["model"])
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            # missing, truncated, or corrupt entries (or entries of another layout) are misses
+            return None
+
+    def put(self, key: str, structure: dict, powl_model: POWL):
+        try:
+            encoding = encode_powl(powl_model)
+        except ValueError:
+            # not a model the converter produces; leave it uncached
+            return
+        # write to a temporary file first, so concurrent readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"net": structure, "model": encoding}, f)
+        os.replace(temp_path, self._path(key))
+
+    def convert(self, net: PetriNet) -> POWL:
+        """
+        Convert a workflow net to POWL, reusing the cached model of a structurally identical net.
+        """
+        key = canonical_net_hash(net)
+        structure = net_structure(net)
+        cached = self.get(key, structure)
+        if cached is not None:
+            return cached
+
+        powl_model = convert_workflow_net_to_powl(net)
+        self.put(key, structure, powl_model)
+        return powl_model
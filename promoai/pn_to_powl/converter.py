@@ -1,7 +1,12 @@
+from array import array
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from copy import deepcopy
+from typing import Callable, Optional
+
 from pm4py import PetriNet
-from powl.objects.BinaryRelation import BinaryRelation
 from powl.objects.obj import Operator, OperatorPOWL, POWL, StrictPartialOrder
 
+from promoai.pn_to_powl.converter_utils.compact_net import CompactNet
 from promoai.pn_to_powl.converter_utils.cut_detection import (
     mine_base_case,
     mine_loop,
@@ -10,170 +15,417 @@ from promoai.pn_to_powl.converter_utils.cut_detection import (
     mine_xor,
 )
 
+from promoai.pn_to_powl.converter_utils.partial_orders import create_partial_order
 from promoai.pn_to_powl.converter_utils.preprocessing import (
     preprocess,
     validate_workflow_net,
 )
+from promoai.pn_to_powl.converter_utils.profiling import (
+    ConversionProfiler,
+    profile_phase,
+)
 from promoai.pn_to_powl.converter_utils.subnet_creation import (
     apply_partial_order_projection,
     clone_subnet,
+    GroupAdjacency,
 )
 from promoai.pn_to_powl.converter_utils.weak_reachability import (
     get_simplified_reachability_graph,
+    ReachabilityGraph,
+    transitive_closure,
 )
 
+# subnets with fewer transitions are not worth the cost of shipping them to a worker process
+PARALLEL_MIN_TRANSITIONS = 100
+
 
-def convert_workflow_net_to_powl(net: PetriNet) -> POWL:
+class Subproblem:
+    """
+    A (sub)net that still has to be translated into POWL.
+
+    Subproblems are independent of each other: a subproblem only refers to its own compact net and
+    reachability map, so siblings can be translated in any order. Once the cut of a subproblem is
+    found, ``children`` holds the subproblems of its parts and ``assemble`` combines their POWL
+    models into the model of this subproblem. A subproblem translated by a worker process has a
+    ``future`` instead of a ``result``.
+    """
+
+    __slots__ = (
+        "net",
+        "reachability_map",
+        "depth",
+        "children",
+        "assemble",
+        "result",
+        "future",
+    )
+
+    def __init__(
+        self,
+        net: CompactNet,
+        reachability_map: Optional[ReachabilityGraph] = None,
+        depth: int = 0,
+    ):
+        self.net = net
+        self.reachability_map = reachability_map
+        self.depth = depth
+        self.children: Optional[list[Subproblem]] = None
+        self.assemble: Optional[Callable[[list[POWL]], POWL]] = None
+        self.result: Optional[POWL] = None
+        self.future: Optional[Future] = None
+
+    def get_result(self) -> POWL:
+        if self.future is not None:
+            # the transitions were numbered by the worker, so copy them to get identifiers that
+            # are unique in this process
+            self.result = deepcopy(self.future.result())
+            self.future = None
+        return self.result
+
+
+def convert_workflow_net_to_powl(
+    net: PetriNet,
+    parallel: bool = False,
+    max_workers: Optional[int] = None,
+    min_parallel_size: int = PARALLEL_MIN_TRANSITIONS,
+    profiler: Optional[ConversionProfiler] = None,
+) -> POWL:
     """
     Convert a Petri net to a POWL model.
 
     Parameters:
     - net: PetriNet
+    - parallel: translate independent subnets (e.g., xor branches or partial order groups) in a
+      process pool
+    - max_workers: number of worker processes (defaults to the number of CPUs)
+    - min_parallel_size: minimal number of transitions of a subnet to be sent to a worker
+    - profiler: collects the time spent in each phase of the conversion
 
     Returns:
     - POWL model
     """
-    start_place, end_place = validate_workflow_net(net)
-    net = preprocess(net)
-    res = __translate_petri_to_powl(net, start_place, end_place)
+    with profile_phase(profiler, "validation"):
+        start_place, end_place = validate_workflow_net(net)
+    with profile_phase(profiler, "preprocess"):
+        net = preprocess(net)
+    with profile_phase(profiler, "indexing"):
+        compact_net = CompactNet.from_petri_net(net, start_place, end_place)
+    if not parallel:
+        return translate_compact_net(compact_net, profiler=profiler)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        res = translate_compact_net(
+            compact_net,
+            executor=executor,
+            min_parallel_size=min_parallel_size,
+            profiler=profiler,
+        )
     return res
 
 
-def __translate_petri_to_powl(
-    net: PetriNet, start_place: PetriNet.Place, end_place: PetriNet.Place
+def translate_compact_net(
+    net: CompactNet,
+    reachability_map: Optional[ReachabilityGraph] = None,
+    executor: Optional[Executor] = None,
+    min_parallel_size: int = PARALLEL_MIN_TRANSITIONS,
+    profiler: Optional[ConversionProfiler] = None,
 ) -> POWL:
+    """
+    Translate a compact workflow net into POWL with an explicit work stack instead of recursion, so
+    the nesting depth of the net is not bounded by the recursion limit.
 
-    base_case = mine_base_case(net)
-    if base_case:
-        return base_case
-
-    reachability_map = get_simplified_reachability_graph(net)
-
-    choice_branches = mine_xor(net, reachability_map)
-    if len(choice_branches) > 1:
-        return __translate_xor(net, start_place, end_place, choice_branches)
+    If an executor is given, sibling subnets with at least ``min_parallel_size`` transitions are
+    translated by the executor while the remaining subproblems are processed here.
+    """
+    root = Subproblem(net, reachability_map)
+    stack = [root]
+    while stack:
+        subproblem = stack.pop()
+        if subproblem.children is None:
+            split_subproblem(subproblem, profiler)
+            if subproblem.children is not None:
+                # assemble the subproblem once all its children are translated
+                stack.append(subproblem)
+                for child in reversed(subproblem.children):
+                    if (
+                        executor is not None
+                        and len(subproblem.children) > 1
+                        and child.net.number_of_transitions >= min_parallel_size
+                    ):
+                        child.future = executor.submit(
+                            translate_compact_net, child.net, child.reachability_map
+                        )
+                        child.reachability_map = None
+                        if profiler is not None:
+                            profiler.parallel_subnets += 1
+                    else:
+                        stack.append(child)
+        else:
+            child_powls = [child.get_result() for child in subproblem.children]
+            with profile_phase(profiler, "assembly"):
+                subproblem.result = subproblem.assemble(child_powls)
+            # the children are not needed anymore
+            subproblem.children = []
+    return root.result
+
+
+def split_subproblem(
+    subproblem: Subproblem, profiler: Optional[ConversionProfiler] = None
+):
+    """
+    Detect the cut of a subproblem. Base cases are translated directly into ``subproblem.result``;
+    otherwise ``subproblem.children`` and ``subproblem.assemble`` are set.
+
+    Cheap structural checks on the start and end places decide which cuts are possible, so the
+    reachability map is only computed for xor and partial order cuts:
+    - if the start place has incoming arcs or the end place has outgoing arcs, some transition
+      reaches (or is reached by) all others, so no xor cut exists; only then a (self-)loop cut is
+      possible, and it is detected structurally;
+    - if the start place has one outgoing arc or the end place has one incoming arc, that
+      transition is connected to all others, so no xor cut exists either.
+    """
+    net = subproblem.net
 
-    self_loop = mine_self_loop(net, start_place, end_place)
-    if self_loop:
-        return __translate_loop(
-            net, self_loop[0], self_loop[1], self_loop[2], self_loop[3]
+    with profile_phase(profiler, "mine_base_case"):
+        base_case = mine_base_case(net)
+    if base_case:
+        subproblem.result = base_case
+        __record_subnet(profiler, subproblem, "base_case")
+        return
+
+    reachability_map = subproblem.reachability_map
+    # the map is only needed while looking for the cut
+    subproblem.reachability_map = None
+
+    cut = None
+    start_in_degree = len(net.place_pre(net.start))
+    end_out_degree = len(net.place_post(net.end))
+    if start_in_degree > 0 or end_out_degree > 0:
+        with profile_phase(profiler, "mine_self_loop"):
+            self_loop = mine_self_loop(net)
+        if self_loop:
+            cut = "self_loop"
+            children, assemble = __translate_self_loop(self_loop[0], self_loop[1])
+        else:
+            with profile_phase(profiler, "mine_loop"):
+                do, redo = mine_loop(net)
+            if do and redo:
+                cut = "loop"
+                children, assemble = __translate_loop(
+                    net, do, redo, reachability_map, profiler
+                )
+
+    if cut is None:
+        if reachability_map is None:
+            with profile_phase(profiler, "reachability"):
+                reachability_map = get_simplified_reachability_graph(net)
+
+        if (
+            start_in_degree == 0
+            and end_out_degree == 0
+            and len(net.place_post(net.start)) > 1
+            and len(net.place_pre(net.end)) > 1
+        ):
+            with profile_phase(profiler, "mine_xor"):
+                choice_branches = mine_xor(net, reachability_map)
+            if len(choice_branches) > 1:
+                cut = "xor"
+                children, assemble = __translate_xor(
+                    net, choice_branches, reachability_map, profiler
+                )
+
+    if cut is None:
+        with profile_phase(profiler, "mine_partial_order"):
+            partitions = mine_partial_order(net, reachability_map)
+        if len(partitions) > 1:
+            cut = "partial_order"
+            children, assemble = __translate_partial_order(
+                net, partitions, reachability_map, profiler
+            )
+        else:
+            raise Exception(
+                f"Failed to detected a POWL structure over the following transitions: {net.transition_labels()}"
+            )
+
+    __record_subnet(profiler, subproblem, cut)
+    subproblem.children = [
+        Subproblem(child_net, child_reachability_map, subproblem.depth + 1)
+        for child_net, child_reachability_map in children
+    ]
+    subproblem.assemble = assemble
+
+
+def __record_subnet(
+    profiler: Optional[ConversionProfiler], subproblem: Subproblem, cut: str
+):
+    if profiler is not None:
+        net = subproblem.net
+        profiler.record_subnet(
+            subproblem.depth,
+            net.number_of_transitions,
+            net.number_of_places,
+            net.number_of_arcs,
+            cut,
         )
 
-    do, redo = mine_loop(net, start_place, end_place)
-    if do and redo:
-        return __translate_loop(net, do, redo, start_place, end_place)
 
-    partitions = mine_partial_order(net, end_place, reachability_map)
-    if len(partitions) > 1:
-        return __translate_partial_order(net, partitions, start_place, end_place)
+def __translate_xor(
+    net: CompactNet,
+    choice_branches: list[set[int]],
+    reachability_map: Optional[ReachabilityGraph] = None,
+    profiler: Optional[ConversionProfiler] = None,
+):
+    children = [
+        __create_subnet(net, branch, net.start, net.end, reachability_map, profiler)
+        for branch in choice_branches
+    ]
 
-    raise Exception(
-        f"Failed to detected a POWL structure over the following transitions: {net.transitions}"
-    )
+    def assemble(child_powls: list[POWL]) -> POWL:
+        return OperatorPOWL(operator=Operator.XOR, children=child_powls)
 
+    return children, assemble
 
-def __translate_xor(
-    net: PetriNet,
-    start_place: PetriNet.Place,
-    end_place: PetriNet.Place,
-    choice_branches: list[set[PetriNet.Transition]],
-):
-    children = []
-    for branch in choice_branches:
-        child_powl = __create_sub_powl_model(net, branch, start_place, end_place)
-        children.append(child_powl)
-    xor_operator = OperatorPOWL(operator=Operator.XOR, children=children)
-    return xor_operator
 
+def __translate_self_loop(do_powl: POWL, redo_net: CompactNet):
+    # the net was split at the loop place, so the reachability has to be computed anew
+    def assemble(child_powls: list[POWL]) -> POWL:
+        return OperatorPOWL(operator=Operator.LOOP, children=[do_powl, child_powls[0]])
 
-def __translate_loop(
-    net: PetriNet,
-    do_nodes,
-    redo_nodes,
-    start_place: PetriNet.Place,
-    end_place: PetriNet.Place,
-) -> OperatorPOWL:
-    do_powl = __create_sub_powl_model(net, do_nodes, start_place, end_place)
-    redo_powl = __create_sub_powl_model(net, redo_nodes, end_place, start_place)
-    loop_operator = OperatorPOWL(operator=Operator.LOOP, children=[do_powl, redo_powl])
-    return loop_operator
+    return [(redo_net, None)], assemble
 
 
-def __validate_partial_order(po: StrictPartialOrder):
-    po.order.add_transitive_edges()
-    if po.order.is_irreflexive():
-        return po
-    else:
-        raise Exception("Conversion failed!")
+def __translate_loop(
+    net: CompactNet,
+    do_nodes: set[int],
+    redo_nodes: set[int],
+    reachability_map: Optional[ReachabilityGraph] = None,
+    profiler: Optional[ConversionProfiler] = None,
+):
+    children = [
+        __create_subnet(net, do_nodes, net.start, net.end, reachability_map, profiler),
+        __create_subnet(
+            net, redo_nodes, net.end, net.start, reachability_map, profiler
+        ),
+    ]
+
+    def assemble(child_powls: list[POWL]) -> POWL:
+        return OperatorPOWL(operator=Operator.LOOP, children=child_powls)
+
+    return children, assemble
+
+
+def __create_partial_order(
+    nodes: list[POWL], order: set[tuple[int, int]], max_depth: int
+) -> StrictPartialOrder:
+    # transitively close the order on bitmasks instead of BinaryRelation.add_transitive_edges,
+    # which is cubic in the number of nodes
+    successors = [[] for _ in nodes]
+    for source, target in order:
+        successors[source].append(target)
+    offsets = array("i", [0])
+    targets = array("i")
+    for node_successors in successors:
+        targets.extend(node_successors)
+        offsets.append(len(targets))
+    closure = transitive_closure(offsets, targets, [1 << i for i in range(len(nodes))])
+
+    edges = []
+    for i, node_successors in enumerate(successors):
+        reachable = 0
+        for j in node_successors:
+            reachable |= closure[j]
+        if (reachable >> i) & 1:
+            raise Exception("Conversion failed!")
+        while reachable:
+            lowest = reachable & -reachable
+            edges.append((i, lowest.bit_length() - 1))
+            reachable ^= lowest
+    return create_partial_order(nodes, edges, max_depth)
 
 
 def __translate_partial_order(
-    net, transition_groups, i_place: PetriNet.Place, f_place: PetriNet.Place
+    net: CompactNet,
+    transition_groups: list[set[int]],
+    reachability_map: Optional[ReachabilityGraph] = None,
+    profiler: Optional[ConversionProfiler] = None,
 ):
+    i_place = net.start
+    f_place = net.end
 
-    groups = [tuple(g) for g in transition_groups]
-    transition_to_group_map = {transition: g for g in groups for transition in g}
+    group_of = [0] * net.number_of_transitions
+    for g, group in enumerate(transition_groups):
+        for transition in group:
+            group_of[transition] = g
+    with profile_phase(profiler, "subnet_creation"):
+        adjacency = GroupAdjacency(net, group_of)
 
-    group_start_places = {g: set() for g in groups}
-    group_end_places = {g: set() for g in groups}
-    temp_po = BinaryRelation(groups)
+    group_start_places = [set() for _ in transition_groups]
+    group_end_places = [set() for _ in transition_groups]
+    order = set()
 
-    for p in net.places:
-        sources = {arc.source for arc in p.in_arcs}
-        targets = {arc.target for arc in p.out_arcs}
+    for p in range(net.number_of_places):
+        source_groups = adjacency.pre[p]
+        target_groups = adjacency.post[p]
 
         # if p is start place and (p -> t), then p should be a start place in the subnet that contains t
         if p == i_place:
-            for t in targets:
-                group_start_places[transition_to_group_map[t]].add(p)
+            for g in target_groups:
+                group_start_places[g].add(p)
         # if p is end place and (t -> p), then p should be end place in the subnet that contains t
         if p == f_place:
-            for t in sources:
-                group_end_places[transition_to_group_map[t]].add(p)
+            for g in source_groups:
+                group_end_places[g].add(p)
 
-        # if (t1 -> p -> t2) and t1 and t2 are in different subsets, then add an edge in the partial order
+        # if (t1 -> p -> t2) and t1 and t2 are in different groups, then add an edge in the partial order
         # and set p as end place in g1 and as start place in g2
-        for t1 in sources:
-            group_1 = transition_to_group_map[t1]
-            for t2 in targets:
-                group_2 = transition_to_group_map[t2]
+        for group_1 in source_groups:
+            for group_2 in target_groups:
                 if group_1 != group_2:
-                    temp_po.add_edge(group_1, group_2)
+                    order.add((group_1, group_2))
                     group_end_places[group_1].add(p)
                     group_start_places[group_2].add(p)
 
-    group_to_powl_map = {}
     children = []
-    for group in groups:
-
-        subnet, subnet_start_place, subnet_end_place = apply_partial_order_projection(
-            net, set(group), group_start_places[group], group_end_places[group]
-        )
-        child = __translate_petri_to_powl(subnet, subnet_start_place, subnet_end_place)
-
-        group_to_powl_map[group] = child
-        children.append(child)
-
-    po = StrictPartialOrder(children)
-    for source in temp_po.nodes:
-        new_source = group_to_powl_map[source]
-        for target in temp_po.nodes:
-            if temp_po.is_edge(source, target):
-                new_target = group_to_powl_map[target]
-                po.order.add_edge(new_source, new_target)
-
-    po = __validate_partial_order(po)
-    return po
-
-
-def __create_sub_powl_model(
-    net,
-    branch: set[PetriNet.Transition],
-    start_place: PetriNet.Place,
-    end_place: PetriNet.Place,
+    for g, group in enumerate(transition_groups):
+        with profile_phase(profiler, "subnet_creation"):
+            subnet = apply_partial_order_projection(
+                net, adjacency, g, group, group_start_places[g], group_end_places[g]
+            )
+        with profile_phase(profiler, "reachability_restriction"):
+            subnet_reachability_map = __restrict_reachability(
+                reachability_map, group, subnet
+            )
+        children.append((subnet, subnet_reachability_map))
+
+    def assemble(child_powls: list[POWL]) -> POWL:
+        # each level of nesting splits off at least one transition
+        return __create_partial_order(child_powls, order, net.number_of_transitions)
+
+    return children, assemble
+
+
+def __create_subnet(
+    net: CompactNet,
+    branch: set[int],
+    start_place: int,
+    end_place: int,
+    reachability_map: Optional[ReachabilityGraph] = None,
+    profiler: Optional[ConversionProfiler] = None,
 ):
-    subnet, subnet_start_place, subnet_end_place = clone_subnet(
-        net, branch, start_place, end_place
-    )
-    powl = __translate_petri_to_powl(subnet, subnet_start_place, subnet_end_place)
-    return powl
+    with profile_phase(profiler, "subnet_creation"):
+        subnet = clone_subnet(net, branch, start_place, end_place)
+    with profile_phase(profiler, "reachability_restriction"):
+        subnet_reachability_map = __restrict_reachability(
+            reachability_map, branch, subnet
+        )
+    return subnet, subnet_reachability_map
+
+
+def __restrict_reachability(
+    reachability_map: Optional[ReachabilityGraph],
+    subnet_transitions: set[int],
+    subnet: CompactNet,
+) -> Optional[ReachabilityGraph]:
+    # the subnet of a single transition is a base case and needs no reachability map
+    if reachability_map is None or len(subnet_transitions) < 2:
+        return None
+    return reachability_map.restrict(subnet_transitions, subnet)
@@ -0,0 +1,219 @@
+from array import array
+from typing import Iterable, Optional
+
+from pm4py import PetriNet
+
+
+class CompactNet:
+    """
+    Array-backed workflow net used during the conversion to POWL.
+
+    Transitions and places are numbered 0..T-1 and 0..P-1. Arcs are stored in compressed sparse row
+    (CSR) form in both directions, e.g., the transitions after place ``p`` are
+    ``place_post_targets[place_post_offsets[p]:place_post_offsets[p + 1]]``.
+
+    All subnets created during a conversion share the label table of the net they were derived from;
+    ``transition_ids[t]`` is the position of transition ``t`` in that table. A subnet only stores the
+    indices and arcs it keeps, so no node objects are allocated until the POWL leaves are created.
+    """
+
+    __slots__ = (
+        "labels",
+        "transition_ids",
+        "number_of_places",
+        "start",
+        "end",
+        "place_post_offsets",
+        "place_post_targets",
+        "place_pre_offsets",
+        "place_pre_sources",
+        "transition_post_offsets",
+        "transition_post_targets",
+        "transition_pre_offsets",
+        "transition_pre_sources",
+    )
+
+    def __init__(
+        self,
+        labels: list[Optional[str]],
+        transition_ids: Iterable[int],
+        number_of_places: int,
+        place_to_transition_arcs: list[tuple[int, int]],
+        transition_to_place_arcs: list[tuple[int, int]],
+        start: int,
+        end: int,
+    ):
+        self.labels = labels
+        self.transition_ids = array("i", transition_ids)
+        self.number_of_places = number_of_places
+        self.start = start
+        self.end = end
+
+        number_of_transitions = len(self.transition_ids)
+        self.place_post_offsets, self.place_post_targets = _to_csr(
+            number_of_places, place_to_transition_arcs
+        )
+        self.place_pre_offsets, self.place_pre_sources = _to_csr(
+            number_of_places, [(p, t) for t, p in transition_to_place_arcs]
+        )
+        self.transition_post_offsets, self.transition_post_targets = _to_csr(
+            number_of_transitions, transition_to_place_arcs
+        )
+        self.transition_pre_offsets, self.transition_pre_sources = _to_csr(
+            number_of_transitions, [(t, p) for p, t in place_to_transition_arcs]
+        )
+
+    @classmethod
+    def from_petri_net(
+        cls,
+        net: PetriNet,
+        start_place: Optional[PetriNet.Place] = None,
+        end_place: Optional[PetriNet.Place] = None,
+    ) -> "CompactNet":
+        """
+        Index a Petri net. Places and transitions are numbered in the iteration order of
+        ``net.places`` and ``net.transitions``. Without start and end places (e.g., before the net
+        is validated), ``start`` and ``end`` are -1.
+        """
+        transitions = list(net.transitions)
+        transition_index = {t: i for i, t in enumerate(transitions)}
+        place_index = {p: i for i, p in enumerate(net.places)}
+
+        place_to_transition_arcs = []
+        transition_to_place_arcs = []
+        for arc in net.arcs:
+            if isinstance(arc.source, PetriNet.Place):
+                place_to_transition_arcs.append(
+                    (place_index[arc.source], transition_index[arc.target])
+                )
+            else:
+                transition_to_place_arcs.append(
+                    (transition_index[arc.source], place_index[arc.target])
+                )
+
+        return cls(
+            [t.label for t in transitions],
+            range(len(transitions)),
+            len(place_index),
+            place_to_transition_arcs,
+            transition_to_place_arcs,
+            place_index[start_place] if start_place is not None else -1,
+            place_index[end_place] if end_place is not None else -1,
+        )
+
+    @property
+    def number_of_transitions(self) -> int:
+        return len(self.transition_ids)
+
+    @property
+    def number_of_arcs(self) -> int:
+        return len(self.place_post_targets) + len(self.transition_post_targets)
+
+    def label(self, transition: int) -> Optional[str]:
+        return self.labels[self.transition_ids[transition]]
+
+    def place_post(self, place: int) -> array:
+        offsets = self.place_post_offsets
+        return self.place_post_targets[offsets[place] : offsets[place + 1]]
+
+    def place_pre(self, place: int) -> array:
+        offsets = self.place_pre_offsets
+        return self.place_pre_sources[offsets[place] : offsets[place + 1]]
+
+    def transition_post(self, transition: int) -> array:
+        offsets = self.transition_post_offsets
+        return self.transition_post_targets[
+            offsets[transition] : offsets[transition + 1]
+        ]
+
+    def transition_pre(self, transition: int) -> array:
+        offsets = self.transition_pre_offsets
+        return self.transition_pre_sources[
+            offsets[transition] : offsets[transition + 1]
+        ]
+
+    def subnet(
+        self,
+        transitions: Iterable[int],
+        start: int,
+        end: int,
+        dropped_places: Optional[set[int]] = None,
+    ) -> "CompactNet":
+        """
+        Create the subnet of the given transitions with all their arcs and adjacent places. Arcs from
+        or to the dropped places are left out (used to merge locally identical places into the start
+        or end place).
+        """
+        transitions = sorted(transitions)
+        place_map = {start: 0}
+        if end not in place_map:
+            place_map[end] = 1
+
+        def map_place(p):
+            if p not in place_map:
+                place_map[p] = len(place_map)
+            return place_map[p]
+
+        place_to_transition_arcs = []
+        transition_to_place_arcs = []
+        for new_t, t in enumerate(transitions):
+            for p in self.transition_pre(t):
+                if not dropped_places or p not in dropped_places:
+                    place_to_transition_arcs.append((map_place(p), new_t))
+            for p in self.transition_post(t):
+                if not dropped_places or p not in dropped_places:
+                    transition_to_place_arcs.append((new_t, map_place(p)))
+
+        return CompactNet(
+            self.labels,
+            (self.transition_ids[t] for t in transitions),
+            len(place_map),
+            place_to_transition_arcs,
+            transition_to_place_arcs,
+            place_map[start],
+            place_map[end],
+        )
+
+    def split_place(self, place: int) -> "CompactNet":
+        """
+        Create a copy of the net where the outgoing arcs of the place are moved to a new place. The
+        new place becomes the start place and the given place becomes the end place.
+        """
+        new_place = self.number_of_places
+        place_to_transition_arcs = [
+            (new_place if p == place else p, t)
+            for p in range(self.number_of_places)
+            for t in self.place_post(p)
+        ]
+        transition_to_place_arcs = [
+            (t, p)
+            for t in range(self.number_of_transitions)
+            for p in self.transition_post(t)
+        ]
+        return CompactNet(
+            self.labels,
+            self.transition_ids,
+            self.number_of_places + 1,
+            place_to_transition_arcs,
+            transition_to_place_arcs,
+            new_place,
+            place,
+        )
+
+    def transition_labels(self) -> list[Optional[str]]:
+        return [self.label(t) for t in range(self.number_of_transitions)]
+
+
+def _to_csr(number_of_rows: int, pairs: list[tuple[int, int]]):
+    # counting sort of the pairs by their first element
+    offsets = array("i", [0]) * (number_of_rows + 1)
+    for row, _ in pairs:
+        offsets[row + 1] += 1
+    for i in range(number_of_rows):
+        offsets[i + 1] += offsets[i]
+    values = array("i", [0]) * len(pairs)
+    position = array("i", offsets[:-1])
+    for row, value in pairs:
+        values[position[row]] = value
+        position[row] += 1
+    return offsets, values
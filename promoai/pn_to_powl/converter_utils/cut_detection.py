@@ -1,60 +1,41 @@
-from copy import copy
-from itertools import combinations
+from powl.objects.obj import SilentTransition
 
-from pm4py.objects.petri_net.obj import PetriNet
-from pm4py.objects.petri_net.utils import petri_utils as pn_util
-
-from promoai.pn_to_powl.converter_utils.subnet_creation import (
-    add_arc_from_to,
-    clone_place,
-    pn_transition_to_powl,
-)
+from promoai.pn_to_powl.converter_utils.compact_net import CompactNet
+from promoai.pn_to_powl.converter_utils.subnet_creation import label_to_powl
 from promoai.pn_to_powl.converter_utils.weak_reachability import (
     get_reachable_transitions_from_place_to_another,
+    ReachabilityGraph,
 )
 
 
-def mine_base_case(net: PetriNet):
-    if len(net.transitions) == 1 and len(net.places) == 2 == len(net.arcs):
-        activity = list(net.transitions)[0]
-        powl_transition = pn_transition_to_powl(activity)
+def mine_base_case(net: CompactNet):
+    if net.number_of_transitions == 1 and net.number_of_places == 2 == net.number_of_arcs:
+        powl_transition = label_to_powl(net.label(0))
         return powl_transition
     return None
 
 
-def mine_self_loop(
-    net: PetriNet, start_place: PetriNet.Place, end_place: PetriNet.Place
-):
-    if start_place == end_place:
-        place = start_place
-        place_copy = clone_place(net, place, {})
-        redo = copy(net.transitions)
-        out_arcs = place.out_arcs
-        for arc in list(out_arcs):
-            target = arc.target
-            pn_util.remove_arc(net, arc)
-            add_arc_from_to(place_copy, target, net)
-        do_transition = PetriNet.Transition(f"silent_do_{place.name}", None)
-        do = set()
-        do.add(do_transition)
-        net.transitions.add(do_transition)
-        add_arc_from_to(place, do_transition, net)
-        add_arc_from_to(do_transition, place_copy, net)
-        return do, redo, place, place_copy
+def mine_self_loop(net: CompactNet):
+    if net.start == net.end:
+        # the do part is a silent transition from the place to a copy that takes over its
+        # outgoing arcs; the redo part is the whole net, starting at the copy
+        do = SilentTransition()
+        redo = net.split_place(net.start)
+        return do, redo
 
     return None
 
 
-def mine_loop(net: PetriNet, start_place: PetriNet.Place, end_place: PetriNet.Place):
+def mine_loop(net: CompactNet):
     redo_subnet_transitions = get_reachable_transitions_from_place_to_another(
-        end_place, start_place
+        net, net.end, net.start
     )
 
     if len(redo_subnet_transitions) == 0:
         return None, None
 
     do_subnet_transitions = get_reachable_transitions_from_place_to_another(
-        start_place, end_place
+        net, net.start, net.end
     )
 
     if len(do_subnet_transitions) == 0:
@@ -64,68 +45,104 @@ def mine_loop(net: PetriNet, start_place: PetriNet.Place, end_place: PetriNet.Pl
         # This could happen if we have ->(..., Loop)
         return None, None
 
-    if net.transitions != (do_subnet_transitions | redo_subnet_transitions):
+    if len(do_subnet_transitions) + len(redo_subnet_transitions) != net.number_of_transitions:
         raise Exception("Something went wrong!")
 
     # A loop is detected: the set of transitions is partitioned into two disjoint, non-empty subsets (do and redo)
     return do_subnet_transitions, redo_subnet_transitions
 
 
-def mine_xor(net: PetriNet, reachability_map):
-    choice_branches = [{t} for t in net.transitions]
+def mine_xor(net: CompactNet, reachability_map: ReachabilityGraph):
+    transitions = range(net.number_of_transitions)
+    choice_branches = _DisjointSets(reachability_map.index[t] for t in transitions)
+
+    # two transitions are in the same branch if one reaches the other; transitions of the same
+    # strongly connected component share their row, so each distinct row is merged once
+    for row in {reachability_map[t] for t in transitions}:
+        choice_branches.union_mask(row)
 
-    for t1, t2 in combinations(net.transitions, 2):
-        if t1 in reachability_map[t2] or t2 in reachability_map[t1]:
-            new_branch = {t1, t2}
-            choice_branches = __combine_parts(new_branch, choice_branches)
+    choice_branches = [
+        {reachability_map.transitions[i] for i in group}
+        for group in choice_branches.groups()
+    ]
 
-    if net.transitions != set().union(*choice_branches):
+    if sum(len(branch) for branch in choice_branches) != net.number_of_transitions:
         raise Exception("This should not happen!")
 
     return choice_branches
 
 
-def mine_partial_order(net, end_place, reachability_map):
-    partition = [{t} for t in net.transitions]
-
-    for place in net.places:
-        out_size = len(place.out_arcs)
-        if out_size > 1 or (place == end_place and out_size > 0):
-            xor_branches = []
-            for start_transition in pn_util.post_set(place):
-                new_branch = {
-                    node
-                    for node in reachability_map[start_transition]
-                    if isinstance(node, PetriNet.Transition)
-                }
-                xor_branches.append(new_branch)
-            union_of_branches = set().union(*xor_branches)
-            if place == end_place:
+def mine_partial_order(net: CompactNet, reachability_map: ReachabilityGraph):
+    partition = _DisjointSets(
+        reachability_map.index[t] for t in range(net.number_of_transitions)
+    )
+
+    for place in range(net.number_of_places):
+        post_set = net.place_post(place)
+        out_size = len(post_set)
+        if out_size > 1 or (place == net.end and out_size > 0):
+            xor_branches = [
+                reachability_map[start_transition] for start_transition in post_set
+            ]
+            union_of_branches = 0
+            intersection_of_branches = -1
+            for branch in xor_branches:
+                union_of_branches |= branch
+                intersection_of_branches &= branch
+            if place == net.end:
                 not_in_every_branch = union_of_branches
             else:
-                intersection_of_branches = set.intersection(*xor_branches)
-                not_in_every_branch = union_of_branches - intersection_of_branches
-            if len(not_in_every_branch) > 1:
-                partition = __combine_parts(not_in_every_branch, partition)
-
-    return partition
-
-
-def __combine_parts(
-    transitions_to_group_together: set[PetriNet.Transition],
-    partition: list[set[PetriNet.Transition]],
-):
-    new_partition = []
-    new_combined_group = set()
-
-    for part in partition:
-
-        if part & transitions_to_group_together:
-            new_combined_group.update(part)
-        else:
-            new_partition.append(part)
-
-    if new_combined_group:
-        new_partition.append(new_combined_group)
-
-    return new_partition
+                not_in_every_branch = union_of_branches & ~intersection_of_branches
+            partition.union_mask(not_in_every_branch)
+
+    return [
+        {reachability_map.transitions[i] for i in group}
+        for group in partition.groups()
+    ]
+
+
+class _DisjointSets:
+    """
+    Union-find over the bit positions of a reachability graph, used to merge the parts of a cut.
+    """
+
+    def __init__(self, elements):
+        self.parent = {e: e for e in elements}
+        self.size = {e: 1 for e in self.parent}
+
+    def find(self, element: int) -> int:
+        parent = self.parent
+        while parent[element] != element:
+            # path halving
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    def union(self, first: int, second: int) -> int:
+        first = self.find(first)
+        second = self.find(second)
+        if first == second:
+            return first
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        return first
+
+    def union_mask(self, mask: int):
+        """Merge all elements whose bits are set in the mask into one set."""
+        if mask & (mask - 1) == 0:
+            # at most one element
+            return
+        root = None
+        while mask:
+            lowest = mask & -mask
+            element = lowest.bit_length() - 1
+            root = element if root is None else self.union(root, element)
+            mask ^= lowest
+
+    def groups(self) -> list[list[int]]:
+        groups = {}
+        for element in self.parent:
+            groups.setdefault(self.find(element), []).append(element)
+        return list(groups.values())
@@ -0,0 +1,149 @@
+import hashlib
+from collections import defaultdict
+
+import networkx as nx
+from networkx.algorithms.isomorphism import (
+    categorical_edge_match,
+    categorical_node_match,
+    DiGraphMatcher,
+)
+from pm4py import PetriNet
+
+# candidate pairs the isomorphism search may test before giving up on a structure comparison
+ISOMORPHISM_BUDGET = 100000
+
+
+def canonical_net_hash(net: PetriNet) -> str:
+    """
+    Compute a structural hash of a Petri net that only depends on the transition labels and the
+    arcs, not on the names of the nodes or the iteration order of the sets of the net.
+
+    The nodes are colored by Weisfeiler-Lehman refinement: starting from the node kind and the
+    transition label, each round hashes the color of a node together with the sorted colors of its
+    pre-set and post-set, until the partition of the nodes stops being refined. Isomorphic nets get
+    the same hash.
+    """
+    colors = _refined_colors(net)
+    arcs = sorted(
+        f"{colors[arc.source]}>{colors[arc.target]}*{arc.weight}" for arc in net.arcs
+    )
+    content = "\n".join(sorted(colors.values()) + arcs)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _refined_colors(net: PetriNet) -> dict:
+    nodes = list(net.places) + list(net.transitions)
+    colors = {p: "p" for p in net.places}
+    colors.update({t: "t" + repr(t.label) for t in net.transitions})
+
+    pre = defaultdict(list)
+    post = defaultdict(list)
+    for arc in net.arcs:
+        post[arc.source].append((arc.target, arc.weight))
+        pre[arc.target].append((arc.source, arc.weight))
+
+    number_of_colors = len(set(colors.values()))
+    for _ in range(len(nodes)):
+        colors = {
+            n: _digest(
+                colors[n],
+                sorted(f"{colors[s]}*{w}" for s, w in pre[n]),
+                sorted(f"{colors[t]}*{w}" for t, w in post[n]),
+            )
+            for n in nodes
+        }
+        new_number_of_colors = len(set(colors.values()))
+        if new_number_of_colors == number_of_colors:
+            break
+        number_of_colors = new_number_of_colors
+    return colors
+
+
+def _digest(color: str, pre_colors: list[str], post_colors: list[str]) -> str:
+    text = color + "|" + ",".join(pre_colors) + "|" + ",".join(post_colors)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def net_structure(net: PetriNet) -> dict:
+    """
+    Labelled structure of a Petri net without the node names: the kind, label, and refined color
+    (see ``canonical_net_hash``) of each node and the arcs between the node indices
+    (JSON-serializable).
+    """
+    nodes = list(net.places) + list(net.transitions)
+    index = {node: i for i, node in enumerate(nodes)}
+    colors = _refined_colors(net)
+    return {
+        "nodes": [["p", None] for _ in net.places]
+        + [["t", t.label] for t in net.transitions],
+        "colors": [colors[node] for node in nodes],
+        "arcs": [
+            [index[arc.source], index[arc.target], arc.weight] for arc in net.arcs
+        ],
+    }
+
+
+def same_structure(
+    structure: dict, other: dict, max_steps: int = ISOMORPHISM_BUDGET
+) -> bool:
+    """
+    Check whether two structures (see ``net_structure``) describe isomorphic nets.
+
+    Structures whose multisets of node and arc colors differ are rejected without a search, and if
+    all colors are distinct those multisets already fix the only possible isomorphism. Otherwise
+    the isomorphism search is limited to ``max_steps`` candidate pairs; structures it cannot
+    decide within the budget are reported as different.
+    """
+    if _color_signature(structure) != _color_signature(other):
+        return False
+    if len(set(structure["colors"])) == len(structure["colors"]):
+        return True
+
+    matcher = _BoundedMatcher(
+        _structure_graph(structure),
+        _structure_graph(other),
+        node_match=categorical_node_match("node", None),
+        edge_match=categorical_edge_match("weight", 1),
+        max_steps=max_steps,
+    )
+    try:
+        return matcher.is_isomorphic()
+    except _BudgetExceeded:
+        return False
+
+
+def _color_signature(structure: dict) -> tuple:
+    colors = structure["colors"]
+    if len(colors) != len(structure["nodes"]):
+        raise ValueError("Every node of the structure needs a color!")
+    arcs = sorted(
+        (colors[source], colors[target], weight)
+        for source, target, weight in structure["arcs"]
+    )
+    return sorted(colors), arcs
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class _BoundedMatcher(DiGraphMatcher):
+    def __init__(self, graph, other, node_match, edge_match, max_steps: int):
+        super().__init__(graph, other, node_match=node_match, edge_match=edge_match)
+        self.steps_left = max_steps
+
+    def syntactic_feasibility(self, G1_node, G2_node):
+        if self.steps_left <= 0:
+            raise _BudgetExceeded()
+        self.steps_left -= 1
+        return super().syntactic_feasibility(G1_node, G2_node)
+
+
+def _structure_graph(structure: dict) -> nx.DiGraph:
+    graph = nx.DiGraph()
+    for i, (kind, label) in enumerate(structure["nodes"]):
+        # isomorphisms preserve the refined colors, so matching on them prunes the search
+        graph.add_node(i, node=(kind, label, structure["colors"][i]))
+    for source, target, weight in structure["arcs"]:
+        graph.add_edge(source, target, weight=weight)
+    return graph
@@ -0,0 +1,28 @@
+import sys
+from typing import Iterable
+
+from powl.objects.obj import POWL, StrictPartialOrder
+
+# recursion depth needed by the caller in addition to the nesting depth of the children
+BASE_RECURSION_LIMIT = 1000
+
+
+def create_partial_order(
+    nodes: list[POWL], edges: Iterable[tuple[int, int]], max_depth: int
+) -> StrictPartialOrder:
+    """
+    Build a strict partial order over the nodes with the given edges (between node indices).
+
+    The order of a StrictPartialOrder is keyed by its nodes, and POWL models hash their whole
+    subtree recursively, so the recursion limit is raised (never lowered) to cover children nested
+    up to ``max_depth`` levels. The raised limit also lets callers hash the returned model.
+    """
+    # two frames per level: the __hash__ (or __eq__) of the node and the call into the child
+    required = BASE_RECURSION_LIMIT + 2 * max_depth
+    if sys.getrecursionlimit() < required:
+        sys.setrecursionlimit(required)
+
+    po = StrictPartialOrder(nodes)
+    for source, target in edges:
+        po.order.add_edge(nodes[source], nodes[target])
+    return po
@@ -0,0 +1,84 @@
+from powl.objects.obj import (
+    Operator,
+    OperatorPOWL,
+    POWL,
+    SilentTransition,
+    StrictPartialOrder,
+    Transition,
+)
+
+from promoai.pn_to_powl.converter_utils.partial_orders import create_partial_order
+
+
+def encode_powl(powl: POWL) -> list[dict]:
+    """
+    Encode a POWL model produced by the converter as a JSON-serializable list of nodes.
+
+    Nodes are listed in post-order (children before their parent, the root last) and refer to their
+    children by index, so the encoding is built and decoded without recursion. Node types the
+    converter does not produce are rejected with an exception.
+    """
+    nodes = []
+    index = {}
+    stack = [(powl, False)]
+    while stack:
+        node, expanded = stack.pop()
+        children = []
+        if isinstance(node, (OperatorPOWL, StrictPartialOrder)):
+            children = node.children
+        if children and not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+            continue
+        child_indices = [index[id(child)] for child in children]
+        if type(node) is SilentTransition:
+            entry = {"type": "silent"}
+        elif type(node) is Transition:
+            entry = {"type": "activity", "label": node.label}
+        elif type(node) is OperatorPOWL and node.operator in (Operator.XOR, Operator.LOOP):
+            entry = {
+                "type": "operator",
+                "operator": node.operator.value,
+                "children": child_indices,
+            }
+        elif type(node) is StrictPartialOrder:
+            order = node.order
+            entry = {
+                "type": "partial_order",
+                "children": child_indices,
+                "edges": [
+                    [i, j]
+                    for i in range(len(children))
+                    for j in range(len(children))
+                    if order.is_edge_id(i, j)
+                ],
+            }
+        else:
+            raise ValueError(f"Cannot encode POWL node of type {type(node).__name__}!")
+        index[id(node)] = len(nodes)
+        nodes.append(entry)
+    return nodes
+
+
+def decode_powl(nodes: list[dict]) -> POWL:
+    """Rebuild the POWL model from its encoding by encode_powl."""
+    decoded = []
+    for entry in nodes:
+        node_type = entry["type"]
+        if node_type == "silent":
+            decoded.append(SilentTransition())
+        elif node_type == "activity":
+            decoded.append(Transition(label=entry["label"]))
+        elif node_type == "operator":
+            operator = Operator(entry["operator"])
+            if operator not in (Operator.XOR, Operator.LOOP):
+                raise ValueError(f"Unsupported operator {operator}!")
+            children = [decoded[i] for i in entry["children"]]
+            decoded.append(OperatorPOWL(operator=operator, children=children))
+        elif node_type == "partial_order":
+            children = [decoded[i] for i in entry["children"]]
+            edges = [(source, target) for source, target in entry["edges"]]
+            decoded.append(create_partial_order(children, edges, max_depth=len(nodes)))
+        else:
+            raise ValueError(f"Unknown POWL node type {node_type}!")
+    return decoded[-1]
@@ -1,32 +1,30 @@
-from itertools import combinations
-
 from pm4py import PetriNet
-from pm4py.algo.analysis.workflow_net import algorithm as wf_eval
 from pm4py.objects.petri_net.utils import petri_utils as pn_util
 
+from promoai.pn_to_powl.converter_utils.compact_net import CompactNet
 from promoai.pn_to_powl.converter_utils.subnet_creation import (
     add_arc_from_to,
     id_generator,
 )
+from promoai.pn_to_powl.converter_utils.workflow_net_validation import (
+    diagnose_workflow_net,
+)
 
 
 def validate_workflow_net(net: PetriNet):
-    places_no_incoming = [p for p in net.places if not p.in_arcs]
-    if len(places_no_incoming) == 1:
-        start_place = places_no_incoming[0]
-    else:
-        raise Exception(f"Not a WF-net!")
-
-    places_no_outgoing = [p for p in net.places if not p.out_arcs]
-    if len(places_no_outgoing) == 1:
-        end_place = places_no_outgoing[0]
-    else:
-        raise Exception(f"Not a WF-net!")
-
-    if not wf_eval.apply(net):
-        raise Exception(f"Not a WF-net!")
+    places = list(net.places)
+    compact_net = CompactNet.from_petri_net(net)
+    diagnostics = diagnose_workflow_net(compact_net)
+    if not diagnostics.is_workflow_net:
+        transitions = list(net.transitions)
+        raise Exception(
+            "Not a WF-net! "
+            + diagnostics.describe(
+                [p.name for p in places], [t.label or t.name for t in transitions]
+            )
+        )
 
-    return start_place, end_place
+    return places[diagnostics.source], places[diagnostics.sink]
 
 
 def remove_initial_and_end_silent_activities(
@@ -67,15 +65,6 @@ def remove_initial_and_end_silent_activities(
     return start_places, end_places
 
 
-def __get_identical_place(place: PetriNet.Place, places_set: set[PetriNet.Place]):
-    for other in places_set:
-        if pn_util.post_set(place) == pn_util.post_set(other) and pn_util.pre_set(
-            place
-        ) == pn_util.pre_set(other):
-            return other
-    return None
-
-
 def __remove_and_replace_if_present(
     old_p: PetriNet.Place, new_p: PetriNet.Place, place_set: set[PetriNet.Place]
 ):
@@ -89,16 +78,16 @@ def __remove_and_replace_if_present(
 def remove_duplicated_places(
     net: PetriNet, start_places: set[PetriNet.Place], end_places: set[PetriNet.Place]
 ):
-    all_places = list(net.places)
-    places_to_keep = {all_places[0]}
-    for place in all_places[1:]:
-        other = __get_identical_place(place, places_to_keep)
+    places_to_keep = {}
+    for place in list(net.places):
+        signature = _signature(place)
+        other = places_to_keep.get(signature)
         if other:
             pn_util.remove_place(net, place)
             start_places = __remove_and_replace_if_present(place, other, start_places)
             end_places = __remove_and_replace_if_present(place, other, end_places)
         else:
-            places_to_keep.add(place)
+            places_to_keep[signature] = place
 
     return start_places, end_places
 
@@ -117,77 +106,194 @@ def remove_unconnected_places(
 
 
 def preprocess(net):
-    all_places = net.places
-    for p1, p2 in combinations(all_places, 2):
-        pre1 = pn_util.pre_set(p1)
-        pre2 = pn_util.pre_set(p2)
-        post1 = pn_util.post_set(p1)
-        post2 = pn_util.post_set(p2)
-
-        if (pre1 == pre2) and (post1 == post2):
-            pn_util.remove_place(net, p2)
-            return preprocess(net)
-
-        if pre1 == pre2:
-            common_post = post1 & post2
-            if len(pre1) > 1 or len(common_post) > 0:
-                new_place = PetriNet.Place(f"place_{next(id_generator())}")
-                net.places.add(new_place)
-
-                for transition in pre1:
-                    add_arc_from_to(transition, new_place, net)
-                    arcs_to_remove = p1.in_arcs | p2.in_arcs
-                    for arc in arcs_to_remove:
-                        pn_util.remove_arc(net, arc)
-
-                for transition in common_post:
-                    add_arc_from_to(new_place, transition, net)
-                    out_arcs = p1.out_arcs | p2.out_arcs
-                    for arc in out_arcs:
-                        if arc.target in common_post:
-                            pn_util.remove_arc(net, arc)
-
-                new_silent = PetriNet.Transition(
-                    f"silent_transition_{next(id_generator())}"
-                )
-                net.transitions.add(new_silent)
-                add_arc_from_to(new_place, new_silent, net)
-                add_arc_from_to(new_silent, p1, net)
-                add_arc_from_to(new_silent, p2, net)
-                return preprocess(net)
-
-        if post1 == post2:
-            common_pre = pre1 & pre2
-            if len(post1) > 1 or len(common_pre) > 0:
-                new_place = PetriNet.Place(f"place_{next(id_generator())}")
-                net.places.add(new_place)
-
-                for transition in post1:
-                    add_arc_from_to(new_place, transition, net)
-                    arcs_to_remove = p1.out_arcs | p2.out_arcs
-                    for arc in arcs_to_remove:
-                        pn_util.remove_arc(net, arc)
-
-                for transition in common_pre:
-                    add_arc_from_to(transition, new_place, net)
-                    in_arcs = p1.in_arcs | p2.in_arcs
-                    for arc in in_arcs:
-                        if arc.source in common_pre:
-                            pn_util.remove_arc(net, arc)
-
-                new_silent = PetriNet.Transition(
-                    f"silent_transition_{next(id_generator())}"
-                )
-                net.transitions.add(new_silent)
-                add_arc_from_to(p1, new_silent, net)
-                add_arc_from_to(p2, new_silent, net)
-                add_arc_from_to(new_silent, new_place, net)
-
-                return preprocess(net)
+    """
+    Simplify the net until no pair of places p1, p2 satisfies one of the following rules:
+    - p1 and p2 have identical pre- and post-sets: p2 is removed;
+    - p1 and p2 have the same pre-set, and it contains several transitions or p1 and p2 share
+      output transitions: the pre-set and the shared output transitions are moved to a new place,
+      which enables p1 and p2 through a silent transition;
+    - the symmetric rule for places with the same post-set.
+
+    Places are indexed by the signatures of their pre- and post-sets, so partners are found by
+    hashing, and only the places whose signature changed are checked again.
+    """
+    signatures = _PlaceSignatures(net.places)
+    worklist = list(net.places)
+
+    while worklist:
+        place = worklist.pop()
+        if place not in signatures:
+            continue
+
+        for duplicate in signatures.identical_places(place):
+            signatures.remove(duplicate)
+            pn_util.remove_place(net, duplicate)
+
+        pre, post = signatures[place]
+        partner = signatures.partner_with_shared_pre_set(place)
+        if partner:
+            common_post = post & signatures[partner][1]
+            new_place = __move_shared_pre_set_to_new_place(
+                net, place, partner, pre, common_post
+            )
+        else:
+            partner = signatures.partner_with_shared_post_set(place)
+            if not partner:
+                continue
+            common_pre = pre & signatures[partner][0]
+            new_place = __move_shared_post_set_to_new_place(
+                net, place, partner, post, common_pre
+            )
+
+        # only the signatures of the two places and the new place are affected
+        signatures.update(place)
+        signatures.update(partner)
+        signatures.add(new_place)
+        worklist.extend([place, partner, new_place])
 
     return net
 
 
+def __move_shared_pre_set_to_new_place(
+    net: PetriNet,
+    p1: PetriNet.Place,
+    p2: PetriNet.Place,
+    pre: frozenset[PetriNet.Transition],
+    common_post: frozenset[PetriNet.Transition],
+) -> PetriNet.Place:
+    new_place = PetriNet.Place(f"place_{next(id_generator())}")
+    net.places.add(new_place)
+
+    for arc in p1.in_arcs | p2.in_arcs:
+        pn_util.remove_arc(net, arc)
+    for transition in pre:
+        add_arc_from_to(transition, new_place, net)
+
+    for arc in p1.out_arcs | p2.out_arcs:
+        if arc.target in common_post:
+            pn_util.remove_arc(net, arc)
+    for transition in common_post:
+        add_arc_from_to(new_place, transition, net)
+
+    new_silent = PetriNet.Transition(f"silent_transition_{next(id_generator())}")
+    net.transitions.add(new_silent)
+    add_arc_from_to(new_place, new_silent, net)
+    add_arc_from_to(new_silent, p1, net)
+    add_arc_from_to(new_silent, p2, net)
+    return new_place
+
+
+def __move_shared_post_set_to_new_place(
+    net: PetriNet,
+    p1: PetriNet.Place,
+    p2: PetriNet.Place,
+    post: frozenset[PetriNet.Transition],
+    common_pre: frozenset[PetriNet.Transition],
+) -> PetriNet.Place:
+    new_place = PetriNet.Place(f"place_{next(id_generator())}")
+    net.places.add(new_place)
+
+    for arc in p1.out_arcs | p2.out_arcs:
+        pn_util.remove_arc(net, arc)
+    for transition in post:
+        add_arc_from_to(new_place, transition, net)
+
+    for arc in p1.in_arcs | p2.in_arcs:
+        if arc.source in common_pre:
+            pn_util.remove_arc(net, arc)
+    for transition in common_pre:
+        add_arc_from_to(transition, new_place, net)
+
+    new_silent = PetriNet.Transition(f"silent_transition_{next(id_generator())}")
+    net.transitions.add(new_silent)
+    add_arc_from_to(p1, new_silent, net)
+    add_arc_from_to(p2, new_silent, net)
+    add_arc_from_to(new_silent, new_place, net)
+    return new_place
+
+
+class _PlaceSignatures:
+    """
+    Index of places by their pre-set, their post-set, and both.
+    """
+
+    def __init__(self, places):
+        self.signatures = {}
+        self.by_pre_set = {}
+        self.by_post_set = {}
+        self.by_signature = {}
+        for place in places:
+            self.add(place)
+
+    def __contains__(self, place) -> bool:
+        return place in self.signatures
+
+    def __getitem__(self, place):
+        return self.signatures[place]
+
+    def add(self, place: PetriNet.Place):
+        signature = _signature(place)
+        self.signatures[place] = signature
+        self.by_pre_set.setdefault(signature[0], set()).add(place)
+        self.by_post_set.setdefault(signature[1], set()).add(place)
+        self.by_signature.setdefault(signature, set()).add(place)
+
+    def remove(self, place: PetriNet.Place):
+        signature = self.signatures.pop(place)
+        for index, key in (
+            (self.by_pre_set, signature[0]),
+            (self.by_post_set, signature[1]),
+            (self.by_signature, signature),
+        ):
+            group = index[key]
+            group.discard(place)
+            if not group:
+                del index[key]
+
+    def update(self, place: PetriNet.Place):
+        self.remove(place)
+        self.add(place)
+
+    def identical_places(self, place: PetriNet.Place) -> list[PetriNet.Place]:
+        return [
+            other
+            for other in self.by_signature[self.signatures[place]]
+            if other is not place
+        ]
+
+    def partner_with_shared_pre_set(self, place: PetriNet.Place):
+        pre, post = self.signatures[place]
+        group = self.by_pre_set[pre]
+        if len(group) < 2:
+            return None
+        if len(pre) > 1:
+            return next(other for other in group if other is not place)
+        # otherwise, the partner must share an output transition
+        for transition in post:
+            for other in pn_util.pre_set(transition):
+                if other is not place and other in group:
+                    return other
+        return None
+
+    def partner_with_shared_post_set(self, place: PetriNet.Place):
+        pre, post = self.signatures[place]
+        group = self.by_post_set[post]
+        if len(group) < 2:
+            return None
+        if len(post) > 1:
+            return next(other for other in group if other is not place)
+        # otherwise, the partner must share an input transition
+        for transition in pre:
+            for other in pn_util.post_set(transition):
+                if other is not place and other in group:
+                    return other
+        return None
+
+
+def _signature(place: PetriNet.Place):
+    return frozenset(pn_util.pre_set(place)), frozenset(pn_util.post_set(place))
+
+
 def add_new_start_and_end_if_needed(
     net, start_places: set[PetriNet.Place], end_places: set[PetriNet.Place]
 ):
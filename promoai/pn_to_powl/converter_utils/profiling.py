@@ -0,0 +1,81 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+
+class ConversionProfiler:
+    """
+    Collects per-phase wall times and counts of a Petri net to POWL conversion.
+
+    Pass an instance to ``convert_workflow_net_to_powl(net, profiler=...)``; afterwards, ``to_dict``
+    and ``to_json`` report the time spent in each phase (validation, preprocessing, reachability,
+    each cut detection attempt, subnet creation, ...), how often each cut was applied, and the depth
+    and size of every translated subnet. Subnets translated by worker processes in parallel mode are
+    only counted, not profiled.
+    """
+
+    def __init__(self):
+        self.phase_seconds: dict[str, float] = {}
+        self.phase_calls: dict[str, int] = {}
+        self.cuts: dict[str, int] = {}
+        self.subnets: list[dict] = []
+        self.parallel_subnets = 0
+        self.max_depth = 0
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + elapsed
+            self.phase_calls[name] = self.phase_calls.get(name, 0) + 1
+
+    def record_subnet(
+        self,
+        depth: int,
+        number_of_transitions: int,
+        number_of_places: int,
+        number_of_arcs: int,
+        cut: str,
+    ):
+        self.max_depth = max(self.max_depth, depth)
+        self.cuts[cut] = self.cuts.get(cut, 0) + 1
+        self.subnets.append(
+            {
+                "depth": depth,
+                "transitions": number_of_transitions,
+                "places": number_of_places,
+                "arcs": number_of_arcs,
+                "cut": cut,
+            }
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "phases": {
+                name: {"seconds": seconds, "calls": self.phase_calls[name]}
+                for name, seconds in sorted(
+                    self.phase_seconds.items(), key=lambda item: -item[1]
+                )
+            },
+            "cuts": dict(self.cuts),
+            "max_depth": self.max_depth,
+            "parallel_subnets": self.parallel_subnets,
+            "subnets": list(self.subnets),
+        }
+
+    def to_json(self, file_path: Optional[str] = None, indent: int = 2) -> str:
+        res = json.dumps(self.to_dict(), indent=indent)
+        if file_path:
+            with open(file_path, "w") as f:
+                f.write(res)
+        return res
+
+
+def profile_phase(profiler: Optional[ConversionProfiler], name: str):
+    if profiler is None:
+        return nullcontext()
+    return profiler.phase(name)
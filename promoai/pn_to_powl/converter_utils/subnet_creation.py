@@ -1,9 +1,10 @@
-from typing import Set, Union
+from typing import Optional, Set, Union
 
 from pm4py.objects.petri_net.obj import PetriNet
-from pm4py.objects.petri_net.utils import petri_utils as pn_util
 from powl.objects.obj import SilentTransition, Transition
 
+from promoai.pn_to_powl.converter_utils.compact_net import CompactNet
+
 
 def id_generator():
     count = 1
@@ -12,114 +13,70 @@ def id_generator():
         count += 1
 
 
-def clone_place(net, place, node_map):
-    cloned_place = PetriNet.Place(f"{place.name}_cloned")
-    net.places.add(cloned_place)
-    node_map[place] = cloned_place
-    return cloned_place
-
-
-def clone_transition(net, transition, node_map):
-    cloned_transition = PetriNet.Transition(
-        f"{transition.name}_cloned", transition.label
-    )
-    net.transitions.add(cloned_transition)
-    node_map[transition] = cloned_transition
-    return cloned_transition
-
-
 def clone_subnet(
-    net: PetriNet,
-    subnet_transitions: Set[PetriNet.Transition],
-    start_place: PetriNet.Place,
-    end_place: PetriNet.Place,
-):
-    subnet_net = PetriNet(f"Subnet_{next(id_generator())}")
-    node_map = {}
-
-    for node in subnet_transitions:
-        clone_transition(subnet_net, node, node_map)
-
-    # Add arcs and remaining places of the subnet
-    for arc in net.arcs:
-        source = arc.source
-        target = arc.target
-        if source in subnet_transitions or target in subnet_transitions:
-            if source in node_map.keys():
-                cloned_source = node_map[source]
-            else:
-                cloned_source = clone_place(subnet_net, source, node_map)
-            if target in node_map.keys():
-                cloned_target = node_map[target]
-            else:
-                cloned_target = clone_place(subnet_net, target, node_map)
-            add_arc_from_to(cloned_source, cloned_target, subnet_net)
-
-    mapped_start_place = node_map[start_place]
-    mapped_end_place = node_map[end_place]
-
-    return subnet_net, mapped_start_place, mapped_end_place
-
-
-def locally_identical(p1, p2, transitions):
-    pre1 = pn_util.pre_set(p1) & transitions
-    pre2 = pn_util.pre_set(p2) & transitions
-    post1 = pn_util.post_set(p1) & transitions
-    post2 = pn_util.post_set(p2) & transitions
-    return pre1 == pre2 and post1 == post2
+    net: CompactNet,
+    subnet_transitions: Set[int],
+    start_place: int,
+    end_place: int,
+) -> CompactNet:
+    return net.subnet(subnet_transitions, start_place, end_place)
+
+
+class GroupAdjacency:
+    """
+    Pre- and post-sets of the places of a net, split by the groups of a partial order cut.
+
+    ``pre[p]`` maps each group with a transition in the pre-set of place ``p`` to these transitions
+    (and ``post[p]`` likewise). The sets are computed in a single pass over the arcs, so the
+    projections of all groups of the cut reuse them.
+    """
+
+    def __init__(self, net: CompactNet, group_of: list[int]):
+        self.pre: list[dict[int, set[int]]] = []
+        self.post: list[dict[int, set[int]]] = []
+        for p in range(net.number_of_places):
+            pre = {}
+            for t in net.place_pre(p):
+                pre.setdefault(group_of[t], set()).add(t)
+            post = {}
+            for t in net.place_post(p):
+                post.setdefault(group_of[t], set()).add(t)
+            self.pre.append(pre)
+            self.post.append(post)
+
+    def locally_identical(self, p1: int, p2: int, group: int) -> bool:
+        return (
+            self.pre[p1].get(group) == self.pre[p2].get(group)
+            and self.post[p1].get(group) == self.post[p2].get(group)
+        )
 
 
 def apply_partial_order_projection(
-    net: PetriNet,
-    subnet_transitions: Set[PetriNet.Transition],
-    start_places: Set[PetriNet.Place],
-    end_places: Set[PetriNet.Place],
-):
-    subnet_net = PetriNet(f"Subnet_{next(id_generator())}")
-    node_map = {}
-
-    for node in subnet_transitions:
-        clone_transition(subnet_net, node, node_map)
-
+    net: CompactNet,
+    adjacency: GroupAdjacency,
+    group: int,
+    subnet_transitions: Set[int],
+    start_places: Set[int],
+    end_places: Set[int],
+) -> CompactNet:
     list_start_places = list(start_places)
     old_start = list_start_places[0]
     for place in list_start_places[1:]:
-        if not locally_identical(place, old_start, subnet_transitions):
+        if not adjacency.locally_identical(place, old_start, group):
             raise Exception("Unique local start property is violated!")
-    new_start_place = clone_place(subnet_net, old_start, node_map)
-    node_map[old_start] = new_start_place
 
     if start_places == end_places:
-        new_end_place = new_start_place
+        old_end = old_start
     else:
         list_end_places = list(end_places)
         old_end = list_end_places[0]
         for place in list_end_places[1:]:
-            if not locally_identical(place, old_end, subnet_transitions):
+            if not adjacency.locally_identical(place, old_end, group):
                 raise Exception("Unique local end property is violated!")
-        new_end_place = clone_place(subnet_net, old_end, node_map)
-        node_map[old_end] = new_end_place
-
-    # Add arcs and remaining places of the subnet
-    for arc in net.arcs:
-        source = arc.source
-        target = arc.target
-        if source in subnet_transitions or target in subnet_transitions:
-            if source in node_map.keys():
-                cloned_source = node_map[source]
-            else:
-                if source in start_places or source in end_places:
-                    continue
-                cloned_source = clone_place(subnet_net, source, node_map)
-            if target in node_map.keys():
-                cloned_target = node_map[target]
-            else:
-                if target in start_places or target in end_places:
-                    continue
-                cloned_target = clone_place(subnet_net, target, node_map)
-            add_arc_from_to(cloned_source, cloned_target, subnet_net)
-
-    return subnet_net, new_start_place, new_end_place
+
+    # the other start and end places are locally identical to the kept ones, so their arcs are dropped
+    dropped_places = (start_places | end_places) - {old_start, old_end}
+    return net.subnet(subnet_transitions, old_start, old_end, dropped_places)
 
 
 def add_arc_from_to(
@@ -133,8 +90,7 @@ def add_arc_from_to(
     target.in_arcs.add(arc)
 
 
-def pn_transition_to_powl(transition: PetriNet.Transition) -> Transition:
-    label = transition.label
+def label_to_powl(label: Optional[str]) -> Transition:
     if label:
         return Transition(label=label)
     else:
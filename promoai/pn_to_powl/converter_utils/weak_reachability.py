@@ -1,38 +1,190 @@
-from collections import deque
+from array import array
 
-from pm4py.objects.petri_net.obj import PetriNet
-from pm4py.objects.petri_net.utils import petri_utils as pn_util
+from promoai.pn_to_powl.converter_utils.compact_net import CompactNet
 
 
-def get_simplified_reachability_graph(net: PetriNet):
-    graph = {node: set() for node in net.transitions}
-    for start_node in graph.keys():
-        reachable = set()
-        queue = deque()
-        queue.append(start_node)
-        while queue:
-            node = queue.popleft()
-            if node not in reachable:
-                reachable.add(node)
-                successors = pn_util.post_set(node)
-                queue.extend(successors)
-        graph[start_node].update(reachable)
-    return graph
+class ReachabilityGraph:
+    """
+    Transition-level reachability of a net, stored as integer bitmasks.
+
+    The bit of a transition is its position in the label table shared by all subnets of a conversion
+    (``net.transition_ids``); ``reachability_map[t]`` is an integer whose bit ``i`` is set iff the
+    transition with id ``i`` is reachable from the transition ``t`` of the net. Every transition
+    reaches itself. Since the bits are shared, the rows of a subnet can be reused by ``restrict``.
+    """
+
+    def __init__(self, transition_ids: array, rows: dict[int, int]):
+        self.index = {t: i for t, i in enumerate(transition_ids)}
+        self.transitions = {i: t for t, i in enumerate(transition_ids)}
+        self.rows = rows
+
+    def __getitem__(self, transition: int) -> int:
+        return self.rows[self.index[transition]]
+
+    def __contains__(self, transition) -> bool:
+        return transition in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def bit(self, transition: int) -> int:
+        return 1 << self.index[transition]
+
+    def mask_of(self, transitions) -> int:
+        mask = 0
+        for t in transitions:
+            mask |= 1 << self.index[t]
+        return mask
+
+    def reaches(self, source: int, target: int) -> bool:
+        return (self.rows[self.index[source]] >> self.index[target]) & 1 == 1
+
+    def transitions_of(self, mask: int) -> set[int]:
+        res = set()
+        while mask:
+            lowest = mask & -mask
+            res.add(self.transitions[lowest.bit_length() - 1])
+            mask ^= lowest
+        return res
+
+    def restrict(
+        self, subnet_transitions: set[int], subnet: CompactNet
+    ) -> "ReachabilityGraph":
+        """
+        Derive the reachability graph of a subnet created from the given transitions of this net.
+
+        If no path leaves the subnet (e.g., for xor branches), the rows are reused as they are.
+        Otherwise, the subnet keeps fewer paths than this net and its rows are computed from its own
+        arrays.
+        """
+        ids = [self.index[t] for t in subnet_transitions]
+        subnet_mask = 0
+        for i in ids:
+            subnet_mask |= 1 << i
+
+        if all(self.rows[i] & ~subnet_mask == 0 for i in ids):
+            return ReachabilityGraph(
+                subnet.transition_ids, {i: self.rows[i] for i in ids}
+            )
+        return get_simplified_reachability_graph(subnet)
+
+
+def get_simplified_reachability_graph(net: CompactNet) -> ReachabilityGraph:
+    # nodes 0..T-1 are the transitions, nodes T..T+P-1 the places
+    number_of_transitions = net.number_of_transitions
+    offsets = array("i", net.transition_post_offsets)
+    offsets.extend(
+        offset + len(net.transition_post_targets)
+        for offset in net.place_post_offsets[1:]
+    )
+    targets = array(
+        "i", (p + number_of_transitions for p in net.transition_post_targets)
+    )
+    targets.extend(net.place_post_targets)
+
+    bits = [1 << i for i in net.transition_ids]
+    bits.extend([0] * net.number_of_places)
+    closure = transitive_closure(offsets, targets, bits)
+    return ReachabilityGraph(
+        net.transition_ids,
+        {i: closure[t] for t, i in enumerate(net.transition_ids)},
+    )
+
+
+def transitive_closure(offsets: array, targets: array, bits: list[int]) -> list[int]:
+    """
+    Compute, for each node of the graph given in CSR form, the union of ``bits`` over all nodes
+    reachable from it. Works on the SCC condensation, so every component is closed exactly once.
+    """
+    component_of, components = _strongly_connected_components(offsets, targets)
+
+    # Tarjan emits the components in reverse topological order: every successor component
+    # is closed before the components that reach it
+    closure = []
+    for component_id, members in enumerate(components):
+        mask = 0
+        for v in members:
+            mask |= bits[v]
+            for w in targets[offsets[v] : offsets[v + 1]]:
+                other = component_of[w]
+                if other != component_id:
+                    mask |= closure[other]
+        closure.append(mask)
+
+    return [closure[component_of[v]] for v in range(len(offsets) - 1)]
+
+
+def _strongly_connected_components(offsets: array, targets: array):
+    # iterative Tarjan, so the depth of the net is not bounded by the recursion limit
+    n = len(offsets) - 1
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    component_of = [-1] * n
+    components = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, offsets[root])]
+        while work:
+            v, i = work[-1]
+            if i < offsets[v + 1]:
+                work[-1] = (v, i + 1)
+                w = targets[i]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, offsets[w]))
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[v] < low[parent]:
+                        low[parent] = low[v]
+                if low[v] == index[v]:
+                    component_id = len(components)
+                    members = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component_of[w] = component_id
+                        members.append(w)
+                        if w == v:
+                            break
+                    components.append(members)
+
+    return component_of, components
 
 
 def get_reachable_transitions_from_place_to_another(
-    start_place: PetriNet.Place, end_place: PetriNet.Place
-):
-    visited = set()
-    queue = deque()
-    queue.append(start_place)
+    net: CompactNet, start_place: int, end_place: int
+) -> set[int]:
+    visited_places = {start_place}
+    visited_transitions = set()
+    queue = [start_place]
     while queue:
-        node = queue.popleft()
-        if node not in visited:
-            visited.add(node)
-            if node == end_place:
-                continue
-            successors = pn_util.post_set(node)
-            queue.extend(successors)
-    visited = {node for node in visited if isinstance(node, PetriNet.Transition)}
-    return visited
+        place = queue.pop()
+        if place == end_place:
+            continue
+        for t in net.place_post(place):
+            if t not in visited_transitions:
+                visited_transitions.add(t)
+                for p in net.transition_post(t):
+                    if p not in visited_places:
+                        visited_places.add(p)
+                        queue.append(p)
+    return visited_transitions
@@ -0,0 +1,162 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Optional
+
+from promoai.pn_to_powl.converter_utils.compact_net import CompactNet
+
+
+@dataclass
+class WorkflowNetDiagnostics:
+    """
+    Result of the workflow net check of a compact net. All entries are place or transition indices
+    of the checked net.
+    """
+
+    source_places: list[int] = field(default_factory=list)
+    sink_places: list[int] = field(default_factory=list)
+    places_not_reachable_from_source: list[int] = field(default_factory=list)
+    transitions_not_reachable_from_source: list[int] = field(default_factory=list)
+    places_not_reaching_sink: list[int] = field(default_factory=list)
+    transitions_not_reaching_sink: list[int] = field(default_factory=list)
+
+    @property
+    def is_workflow_net(self) -> bool:
+        return (
+            len(self.source_places) == 1
+            and len(self.sink_places) == 1
+            and not self.places_not_reachable_from_source
+            and not self.transitions_not_reachable_from_source
+            and not self.places_not_reaching_sink
+            and not self.transitions_not_reaching_sink
+        )
+
+    @property
+    def source(self) -> Optional[int]:
+        return self.source_places[0] if len(self.source_places) == 1 else None
+
+    @property
+    def sink(self) -> Optional[int]:
+        return self.sink_places[0] if len(self.sink_places) == 1 else None
+
+    def describe(
+        self,
+        place_names: Optional[list[str]] = None,
+        transition_names: Optional[list[str]] = None,
+    ) -> str:
+        """
+        Describe the violations, using the given names of the places and transitions if available.
+        """
+
+        def names(indices, all_names):
+            return ", ".join(
+                str(all_names[i]) if all_names else str(i) for i in indices
+            )
+
+        problems = []
+        if len(self.source_places) != 1:
+            problems.append(
+                f"expected one source place, found {len(self.source_places)}"
+                f" ({names(self.source_places, place_names)})"
+            )
+        if len(self.sink_places) != 1:
+            problems.append(
+                f"expected one sink place, found {len(self.sink_places)}"
+                f" ({names(self.sink_places, place_names)})"
+            )
+        for indices, all_names, problem in [
+            (
+                self.places_not_reachable_from_source,
+                place_names,
+                "places not reachable from the source",
+            ),
+            (
+                self.transitions_not_reachable_from_source,
+                transition_names,
+                "transitions not reachable from the source",
+            ),
+            (
+                self.places_not_reaching_sink,
+                place_names,
+                "places that cannot reach the sink",
+            ),
+            (
+                self.transitions_not_reaching_sink,
+                transition_names,
+                "transitions that cannot reach the sink",
+            ),
+        ]:
+            if indices:
+                problems.append(f"{problem}: {names(indices, all_names)}")
+        return "; ".join(problems)
+
+
+def diagnose_workflow_net(net: CompactNet) -> WorkflowNetDiagnostics:
+    """
+    Check whether a compact net is a workflow net: it has a unique source place, a unique sink place,
+    and every node lies on a path from the source to the sink (i.e., the short-circuited net is
+    strongly connected). Runs in linear time in the size of the net.
+    """
+    diagnostics = WorkflowNetDiagnostics()
+    for p in range(net.number_of_places):
+        if net.place_pre_offsets[p] == net.place_pre_offsets[p + 1]:
+            diagnostics.source_places.append(p)
+        if net.place_post_offsets[p] == net.place_post_offsets[p + 1]:
+            diagnostics.sink_places.append(p)
+
+    source, sink = diagnostics.source, diagnostics.sink
+    if source is None or sink is None:
+        return diagnostics
+
+    places, transitions = _visit(
+        net,
+        source,
+        net.place_post_offsets,
+        net.place_post_targets,
+        net.transition_post_offsets,
+        net.transition_post_targets,
+    )
+    diagnostics.places_not_reachable_from_source = _unvisited(places)
+    diagnostics.transitions_not_reachable_from_source = _unvisited(transitions)
+
+    places, transitions = _visit(
+        net,
+        sink,
+        net.place_pre_offsets,
+        net.place_pre_sources,
+        net.transition_pre_offsets,
+        net.transition_pre_sources,
+    )
+    diagnostics.places_not_reaching_sink = _unvisited(places)
+    diagnostics.transitions_not_reaching_sink = _unvisited(transitions)
+    return diagnostics
+
+
+def _visit(
+    net: CompactNet,
+    start_place: int,
+    place_offsets: array,
+    place_neighbors: array,
+    transition_offsets: array,
+    transition_neighbors: array,
+):
+    # depth-first search over the bipartite graph in the direction of the given CSR arrays
+    visited_places = bytearray(net.number_of_places)
+    visited_transitions = bytearray(net.number_of_transitions)
+    visited_places[start_place] = 1
+    stack = [start_place]
+    while stack:
+        p = stack.pop()
+        for t in place_neighbors[place_offsets[p] : place_offsets[p + 1]]:
+            if not visited_transitions[t]:
+                visited_transitions[t] = 1
+                for q in transition_neighbors[
+                    transition_offsets[t] : transition_offsets[t + 1]
+                ]:
+                    if not visited_places[q]:
+                        visited_places[q] = 1
+                        stack.append(q)
+    return visited_places, visited_transitions
+
+
+def _unvisited(visited: bytearray) -> list[int]:
+    return [i for i, flag in enumerate(visited) if not flag]
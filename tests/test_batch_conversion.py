@@ -0,0 +1,31 @@
+import json
+
+import pm4py
+from powl import convert_to_petri_net
+
+from promoai.batch_conversion import main
+from promoai.model_generation.generator import ModelGenerator
+
+
+def test_batch_conversion_writes_one_record_per_model(tmp_path):
+    gen = ModelGenerator()
+    choice = gen.xor(gen.activity("B"), gen.activity("C"))
+    model = gen.partial_order(dependencies=[(gen.activity("A"), choice)])
+    net, im, fm = convert_to_petri_net(model)
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    pm4py.write_pnml(net, im, fm, str(models_dir / "model.pnml"))
+    (models_dir / "broken.bpmn").write_text("not a bpmn file")
+    output = tmp_path / "results.jsonl"
+
+    exit_code = main([str(models_dir), "-o", str(output), "-j", "2"])
+
+    records = {
+        record["file"].rsplit("/", 1)[-1]: record
+        for record in map(json.loads, output.read_text().splitlines())
+    }
+    assert exit_code == 1
+    assert records["model.pnml"]["status"] == "ok"
+    assert "gen.activity('B')" in records["model.pnml"]["powl_code"]
+    assert records["broken.bpmn"]["status"] == "error"
+    assert all(record["seconds"] >= 0 for record in records.values())
@@ -0,0 +1,140 @@
+import json
+
+import pm4py
+import pytest
+from pm4py import PetriNet
+from pm4py.objects.petri_net.utils import petri_utils as pn_util
+from powl import convert_to_petri_net
+
+from promoai.pn_to_powl import conversion_cache
+from promoai.pn_to_powl.conversion_cache import ConversionCache
+from promoai.pn_to_powl.converter_utils.net_hashing import (
+    canonical_net_hash,
+    net_structure,
+    same_structure,
+)
+from promoai.pn_to_powl.converter_utils.powl_encoding import encode_powl
+
+
+def _sequence_net(names, labels):
+    net = PetriNet("sequence")
+    places = [PetriNet.Place(name) for name in names]
+    net.places.update(places)
+    for i, label in enumerate(labels):
+        transition = PetriNet.Transition(f"t_{names[i]}", label)
+        net.transitions.add(transition)
+        pn_util.add_arc_from_to(places[i], transition, net)
+        pn_util.add_arc_from_to(transition, places[i + 1], net)
+    return net
+
+
+def _loops_net(crossed):
+    # two loops after a parallel split; crossed, each loop returns to the other branch
+    net = PetriNet("loops")
+    places = {name: PetriNet.Place(name) for name in ["i", "p1", "p2", "q1", "q2", "o"]}
+    net.places.update(places.values())
+    transitions = [
+        ("split", "A", ["i"], ["p1", "q1"]),
+        ("x1", "X", ["p1"], ["p2"]),
+        ("x2", "X", ["q1"], ["q2"]),
+        ("y1", "Y", ["p2"], ["q1" if crossed else "p1"]),
+        ("y2", "Y", ["q2"], ["p1" if crossed else "q1"]),
+        ("join", "B", ["p1", "q1"], ["o"]),
+    ]
+    for name, label, inputs, outputs in transitions:
+        transition = PetriNet.Transition(name, label)
+        net.transitions.add(transition)
+        for place in inputs:
+            pn_util.add_arc_from_to(places[place], transition, net)
+        for place in outputs:
+            pn_util.add_arc_from_to(transition, places[place], net)
+    return net
+
+
+def test_hash_ignores_names_but_not_labels():
+    net = _sequence_net(["i", "p", "o"], ["A", "B"])
+    renamed = _sequence_net(["source", "x", "sink"], ["A", "B"])
+    relabeled = _sequence_net(["i", "p", "o"], ["A", "C"])
+    assert canonical_net_hash(net) == canonical_net_hash(renamed)
+    assert canonical_net_hash(net) != canonical_net_hash(relabeled)
+
+
+def test_cache_hit_skips_conversion(tmp_path, monkeypatch):
+    cache = ConversionCache(str(tmp_path))
+    model = cache.convert(_sequence_net(["i", "p", "o"], ["A", "B"]))
+
+    def fail(net):
+        raise AssertionError("the net should not be converted again")
+
+    monkeypatch.setattr(conversion_cache, "convert_workflow_net_to_powl", fail)
+    cached = cache.convert(_sequence_net(["source", "x", "sink"], ["A", "B"]))
+
+    net, im, fm = convert_to_petri_net(model)
+    cached_net, cached_im, cached_fm = convert_to_petri_net(cached)
+    assert pm4py.discover_footprints(net, im, fm) == pm4py.discover_footprints(
+        cached_net, cached_im, cached_fm
+    )
+
+
+def test_hash_collision_is_not_a_hit(tmp_path):
+    loops = _loops_net(crossed=False)
+    crossed = _loops_net(crossed=True)
+    # colour refinement cannot tell these nets apart
+    assert canonical_net_hash(loops) == canonical_net_hash(crossed)
+    assert not same_structure(net_structure(loops), net_structure(crossed))
+
+    cache = ConversionCache(str(tmp_path))
+    model = cache.convert(loops)
+    assert len(model.children) == 4
+    # without the structure check, the model of the other net would be returned
+    with pytest.raises(Exception, match="Unique local start"):
+        cache.convert(crossed)
+    assert cache.get(canonical_net_hash(loops), net_structure(_loops_net(False)))
+
+
+def test_corrupt_entries_are_misses(tmp_path):
+    net = _sequence_net(["i", "p", "o"], ["A", "B"])
+    cache = ConversionCache(str(tmp_path))
+    cache.convert(net)
+    path = cache._path(canonical_net_hash(net))
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    for corrupt in [content[: len(content) // 2], "{}", '{"net": [1], "model": []}']:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(corrupt)
+        assert cache.get(canonical_net_hash(net), net_structure(net)) is None
+        model = cache.convert(net)
+        assert {child.label for child in model.children} == {"A", "B"}
+
+
+def test_entries_store_data_not_code(tmp_path):
+    cache = ConversionCache(str(tmp_path))
+    model = cache.convert(_loops_net(crossed=False))
+    key = canonical_net_hash(_loops_net(crossed=False))
+    with open(cache._path(key), "r", encoding="utf-8") as f:
+        entry = json.load(f)
+    assert "code" not in entry
+    assert entry["model"] == encode_powl(model)
+
+    cached = cache.get(key, net_structure(_loops_net(crossed=False)))
+    assert cached is not model
+    assert encode_powl(cached) == encode_powl(model)
+    # an entry whose model is not a valid encoding is a miss
+    entry["model"][-1]["type"] = "__import__('os')"
+    with open(cache._path(key), "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    assert cache.get(key, net_structure(_loops_net(crossed=False))) is None
+
+
+def test_structure_comparison_is_bounded():
+    # all colors distinct: the color multisets decide without a search
+    sequence = net_structure(_sequence_net(["i", "p", "o"], ["A", "B"]))
+    renamed = net_structure(_sequence_net(["source", "x", "sink"], ["A", "B"]))
+    assert same_structure(sequence, renamed, max_steps=0)
+
+    loops = net_structure(_loops_net(crossed=False))
+    other = net_structure(_loops_net(crossed=False))
+    assert same_structure(loops, other)
+    # symmetric nets need a search, which gives up (a miss) once the budget is spent
+    assert not same_structure(loops, other, max_steps=3)
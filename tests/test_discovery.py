@@ -0,0 +1,234 @@
+import gzip
+import os
+from collections import Counter
+
+import pandas as pd
+import pm4py
+from pm4py.util.compression import util as comut
+from powl import convert_to_petri_net, import_event_log
+
+from promoai.discovery.columnar_import import read_event_table
+from promoai import main
+from promoai.discovery import discovery_cache
+from promoai.discovery.discovery_cache import DiscoveryCache, log_fingerprint
+from promoai.discovery.dfg_discovery import discover_powl_from_dfg, filter_dfg_noise
+from promoai.discovery.parallel_variants import discover_variants_parallel
+from promoai.discovery.xes_streaming import discover_dfg_from_xes
+from promoai.main import generate_model_from_event_log
+
+TRACES = [
+    ["register", "check", "decide", "pay"],
+    ["register", "check", "decide", "reject"],
+    ["register", "check", "check", "decide", "pay"],
+    ["register", "decide", "pay"],
+]
+
+
+def _write_xes(path, traces):
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<log xes.version="1.0" xmlns="http://www.xes-standard.org/">',
+        '<global scope="event"><string key="lifecycle:transition" value="complete"/></global>',
+    ]
+    for i, trace in enumerate(traces):
+        lines.append(f'<trace><string key="concept:name" value="case_{i}"/>')
+        for j, activity in enumerate(trace):
+            timestamp = f"2024-01-01T00:{i:02d}:{j:02d}.000+00:00"
+            lines.append(
+                f'<event><string key="concept:name" value="{activity}"/>'
+                f'<date key="time:timestamp" value="{timestamp}"/>'
+                '<string key="lifecycle:transition" value="start"/></event>'
+            )
+            lines.append(
+                f'<event><string key="concept:name" value="{activity}"/>'
+                f'<date key="time:timestamp" value="{timestamp}"/></event>'
+            )
+        lines.append("</trace>")
+    lines.append("</log>")
+    content = "\n".join(lines).encode("utf-8")
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "wb") as f:
+        f.write(content)
+
+
+def _structure(model):
+    """Structure of a POWL model, with the children of partial orders in a canonical order."""
+    children = getattr(model, "children", None) or []
+    structures = [_structure(child) for child in children]
+    order = getattr(model, "order", None)
+    if order is None:
+        return type(model).__name__, model.label, str(model.operator), tuple(structures)
+    # the order of the children of a partial order (or decision graph) is not meaningful
+    ranks = sorted(range(len(children)), key=lambda i: repr(structures[i]))
+    position = {i: rank for rank, i in enumerate(ranks)}
+    edges = sorted(
+        (position[i], position[j])
+        for i, source in enumerate(children)
+        for j, target in enumerate(children)
+        if order.is_edge(source, target)
+    )
+    return (
+        type(model).__name__,
+        tuple(structures[i] for i in ranks),
+        tuple(edges),
+    )
+
+
+def test_streamed_dfg_matches_imported_log(tmp_path):
+    path = tmp_path / "log.xes"
+    _write_xes(path, TRACES)
+
+    dfg = discover_dfg_from_xes(str(path))
+
+    log = import_event_log(str(path))
+    log = log[log["lifecycle:transition"] == "complete"]
+    expected_graph, expected_start, expected_end = pm4py.discover_dfg(log)
+    assert dict(dfg.graph) == dict(expected_graph)
+    assert dict(dfg.start_activities) == dict(expected_start)
+    assert dict(dfg.end_activities) == dict(expected_end)
+
+
+def test_streaming_discovery_from_gzipped_xes(tmp_path):
+    path = tmp_path / "log.xes.gz"
+    _write_xes(path, TRACES + [["register", "pay"]] + [TRACES[0]] * 20)
+
+    dfg = discover_dfg_from_xes(str(path))
+    assert dfg.graph[("register", "pay")] == 1
+    assert ("register", "pay") not in filter_dfg_noise(dfg, 0.2).graph
+
+    model = discover_powl_from_dfg(dfg, threshold=0.2)
+    net, im, fm = convert_to_petri_net(model)
+    labels = {t.label for t in net.transitions if t.label}
+    assert labels == {"register", "check", "decide", "pay", "reject"}
+
+
+def test_parallel_discovery_matches_default_discovery(tmp_path):
+    path = tmp_path / "log.xes"
+    _write_xes(path, TRACES * 5 + [["register", "pay"], ["check", "register", "pay"]])
+    log = import_event_log(str(path))
+
+    expected = comut.get_variants(
+        comut.project_univariate(
+            log[log["lifecycle:transition"] == "complete"].sort_values(
+                ["case:concept:name", "time:timestamp"]
+            )
+        )
+    )
+    for workers in [1, 3]:
+        variants = discover_variants_parallel(
+            log, workers=workers, min_parallel_events=0
+        )
+        assert list(variants.items()) == list(expected.items())
+
+    for threshold in [0.0, 0.3]:
+        model = generate_model_from_event_log(str(path), threshold).get_powl()
+        for workers in [1, 2]:
+            model_gen = generate_model_from_event_log(
+                str(path), threshold, workers=workers
+            )
+            assert _structure(model_gen.get_powl()) == _structure(model)
+
+
+def test_columnar_event_logs(tmp_path):
+    rows = []
+    for i, trace in enumerate(TRACES):
+        for j, activity in enumerate(trace):
+            rows.append(
+                {
+                    "case:concept:name": f"case_{i}",
+                    "concept:name": activity,
+                    "time:timestamp": f"2024-01-01T00:{j:02d}:{i:02d}",
+                    "org:resource": "clerk",
+                }
+            )
+    # events shuffled across cases and within each case
+    df = pd.DataFrame(rows[::-1])
+    df.to_csv(tmp_path / "log.csv", index=False)
+    df.assign(**{"time:timestamp": pd.to_datetime(df["time:timestamp"])}).to_parquet(
+        tmp_path / "log.parquet"
+    )
+
+    for name in ["log.csv", "log.parquet"]:
+        table = read_event_table(str(tmp_path / name))
+        assert list(table.columns) == [
+            "case:concept:name",
+            "concept:name",
+            "time:timestamp",
+        ]
+        traces = table.groupby("case:concept:name", sort=True)["concept:name"]
+        assert [list(trace) for _, trace in traces] == TRACES
+
+        model_gen = generate_model_from_event_log(str(tmp_path / name))
+        net, im, fm = convert_to_petri_net(model_gen.get_powl())
+        log = pm4py.convert_to_event_log(table)
+        fitness = pm4py.fitness_token_based_replay(log, net, im, fm)
+        assert fitness["perc_fit_traces"] == 100.0
+
+
+def test_discovery_cache_reuses_variants(tmp_path, monkeypatch):
+    path = tmp_path / "log.xes"
+    _write_xes(path, TRACES + [["register", "pay"]] + [TRACES[0]] * 20)
+    cache = DiscoveryCache(str(tmp_path / "cache"))
+    thresholds = [0.0, 0.2, 0.5]
+    expected = [
+        _structure(generate_model_from_event_log(str(path), t).get_powl())
+        for t in thresholds
+    ]
+
+    model_gen = generate_model_from_event_log(str(path), thresholds[0], cache=cache)
+    assert _structure(model_gen.get_powl()) == expected[0]
+    variants = cache.get_variants(log_fingerprint(str(path)) + "-variants")
+    assert variants[tuple(TRACES[0])] == 21
+    assert variants[("register", "pay")] == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the log should not be aggregated again")
+
+    monkeypatch.setattr(main, "discover_variants_parallel", fail)
+    monkeypatch.setattr(main, "import_event_log", fail)
+    for threshold, structure in zip(thresholds, expected):
+        model_gen = generate_model_from_event_log(str(path), threshold, cache=cache)
+        assert _structure(model_gen.get_powl()) == structure
+
+    streamed = generate_model_from_event_log(str(path), 0.2, streaming=True)
+    model_gen = generate_model_from_event_log(
+        str(path), 0.2, streaming=True, cache=cache
+    )
+    assert _structure(model_gen.get_powl()) == _structure(streamed.get_powl())
+    monkeypatch.setattr(main, "discover_dfg_from_xes", fail)
+    model_gen = generate_model_from_event_log(
+        str(path), 0.2, streaming=True, cache=cache
+    )
+    assert _structure(model_gen.get_powl()) == _structure(streamed.get_powl())
+
+    log = import_event_log(str(path))
+    assert log_fingerprint(log) == log_fingerprint(log.copy())
+    changed = log.copy()
+    changed.loc[changed.index[0], "concept:name"] = "other"
+    assert log_fingerprint(log) != log_fingerprint(changed)
+
+
+def test_discovery_cache_evicts_entries(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(discovery_cache.time, "time", lambda: now[0])
+    cache = DiscoveryCache(str(tmp_path / "cache"), max_entries=2, ttl_s=60)
+    variants = Counter({("register", "pay"): 2})
+
+    cache.put_variants("a", variants)
+    now[0] += 1
+    cache.put_variants("b", variants)
+    now[0] += 1
+    assert cache.get_variants("a") == variants
+    now[0] += 1
+    cache.put_variants("c", variants)
+    # 'b' is the least recently used entry
+    assert cache.get_variants("b") is None
+    assert sorted(os.listdir(cache.directory)) == ["a.json", "c.json"]
+
+    now[0] += 58
+    assert cache.get_variants("a") is None
+    assert cache.get_variants("c") == variants
+    now[0] += 60
+    cache.put_variants("d", variants)
+    # expired entries are removed from the disk as well
+    assert sorted(os.listdir(cache.directory)) == ["d.json"]
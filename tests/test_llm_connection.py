@@ -0,0 +1,394 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from promoai.general_utils import llm_connection
+from promoai.general_utils import rate_limiting
+from promoai.general_utils.ai_providers import AIProviders
+from promoai.general_utils.response_cache import MemoryResponseCache
+from promoai.general_utils.retry_policy import RetryPolicy
+from promoai.model_generation.llm_model_generator import LLMProcessModelGenerator
+from promoai.model_generation.model_generation import extract_model_from_response
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.client_address, request))
+        status, body, headers = self.server.respond(request)
+        if request.get("stream"):
+            self._send_event_stream(body)
+            return
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_event_stream(self, pieces):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [{"choices": [{"delta": {"content": text}}]} for text in pieces]
+        for event in events + ["[DONE]"]:
+            if event == "[DONE]":
+                data = b"data: [DONE]\n\n"
+            else:
+                data = f"data: {json.dumps(event)}\n\n".encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+            time.sleep(self.server.stream_delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def _chat_completion(text):
+    return {"choices": [{"message": {"role": "assistant", "content": text}}]}
+
+
+@pytest.fixture
+def chat_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+    server.requests = []
+    server.stream_delay = 0.0
+    server.respond = lambda request: (200, _chat_completion("ok"), {})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    llm_connection.close_sessions()
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+MODEL_RESPONSE = """```python
+from promoai.model_generation.generator import ModelGenerator
+gen = ModelGenerator()
+final_model = gen.partial_order(dependencies=[(gen.activity('A'), gen.activity('B'))])
+```"""
+
+
+def test_requests_reuse_pooled_connection(chat_server):
+    conversation = [{"role": "user", "content": "Hello"}]
+    for _ in range(5):
+        response = llm_connection.generate_response_with_history(
+            conversation, "key", "model", _url(chat_server)
+        )
+        assert response == "ok"
+
+    client_addresses = {address for address, _ in chat_server.requests}
+    assert len(chat_server.requests) == 5
+    assert len(client_addresses) == 1
+
+
+def test_sdk_clients_are_reused_per_key(monkeypatch):
+    created = []
+
+    class FakeModels:
+        def generate_content(self, model, contents):
+            return type("Response", (), {"text": "ok"})()
+
+    class FakeClient:
+        def __init__(self, api_key):
+            created.append(api_key)
+            self.models = FakeModels()
+
+    monkeypatch.setattr(llm_connection.genai, "Client", FakeClient)
+    monkeypatch.setattr(llm_connection, "MAX_CACHED_CLIENTS", 2)
+    monkeypatch.setattr(llm_connection, "_clients", llm_connection.OrderedDict())
+    conversation = [{"role": "user", "content": "Hello"}]
+
+    for api_key in ["a", "a", "b", "a", "c", "a", "b"]:
+        response = llm_connection.generate_response_with_history_google(
+            conversation, api_key, "model"
+        )
+        assert response == "ok"
+
+    # 'b' is the least recently used client when 'c' is added
+    assert created == ["a", "b", "c", "b"]
+
+
+def test_evicted_async_clients_are_closed(monkeypatch):
+    closed = []
+
+    class FakeClient:
+        def __init__(self, name):
+            self.name = name
+
+        async def aclose(self):
+            closed.append(self.name)
+
+    monkeypatch.setattr(llm_connection, "MAX_CACHED_CLIENTS", 1)
+
+    async def use_clients():
+        async with llm_connection._async_client("p", "a", lambda: FakeClient("a")):
+            # 'a' is evicted while a request is still using it
+            async with llm_connection._async_client("p", "b", lambda: FakeClient("b")):
+                pass
+            assert closed == []
+        assert closed == ["a"]
+        async with llm_connection._async_client("p", "c", lambda: FakeClient("c")):
+            pass
+        assert closed == ["a", "b"]
+
+    asyncio.run(use_clients())
+
+
+def test_async_generation(chat_server, monkeypatch):
+    def respond(request):
+        # the first answer has no code, so the repair loop sends the error back
+        text = MODEL_RESPONSE if len(request["messages"]) > 2 else "no code"
+        return 200, _chat_completion(text), {}
+
+    chat_server.respond = respond
+    monkeypatch.setattr(
+        llm_connection,
+        "_openai_compatible_api",
+        lambda provider: (_url(chat_server), False),
+    )
+
+    async def generate_all():
+        return await asyncio.gather(
+            *[
+                LLMProcessModelGenerator.afrom_description(
+                    f"Process {i}", "key", "model", AIProviders.DEEPINFRA.value
+                )
+                for i in range(10)
+            ]
+        )
+
+    generators = asyncio.run(generate_all())
+    for generator in generators:
+        labels = {node.label for node in generator.get_powl().children}
+        assert labels == {"A", "B"}
+        assert generator.get_conversation()[-2]["type"] == "error"
+    assert len(chat_server.requests) == 20
+
+
+def test_streamed_generation_extracts_before_the_end(chat_server, monkeypatch):
+    pieces = ["Here is the model:\n", MODEL_RESPONSE[:40], MODEL_RESPONSE[40:]]
+    pieces += ["\n\nThe model", " first runs A", " and then B."]
+    chat_server.respond = lambda request: (200, pieces, {})
+    chat_server.stream_delay = 0.2
+    monkeypatch.setattr(
+        llm_connection,
+        "_openai_compatible_api",
+        lambda provider: (_url(chat_server), False),
+    )
+
+    extraction_started = []
+    partial_responses = []
+
+    def extraction_function(response, auto_duplicate):
+        # serialized with the extractions of the other generations
+        assert llm_connection._extraction_lock.locked()
+        extraction_started.append(len(partial_responses))
+        return extract_model_from_response(response, auto_duplicate)
+
+    code, model, conversation = llm_connection.generate_result_with_error_handling(
+        [{"role": "user", "content": "Model the process."}],
+        extraction_function,
+        "key",
+        "model",
+        AIProviders.DEEPINFRA.value,
+        stream=True,
+        on_partial_response=partial_responses.append,
+    )
+
+    assert {node.label for node in model.children} == {"A", "B"}
+    assert conversation[-1]["content"] == partial_responses[-1]
+    assert partial_responses[-1].endswith("and then B.")
+    # started once the python block was closed, before the explanation arrived
+    assert extraction_started == [3]
+
+
+def test_failed_stream_cancels_pending_extractions():
+    first_started = threading.Event()
+    release = threading.Event()
+    extracted = []
+
+    def extraction_function(response, auto_duplicate):
+        extracted.append(response)
+        first_started.set()
+        release.wait(5)
+        return response, None
+
+    def chunks():
+        yield "```python\nfirst = 1\n```"
+        first_started.wait(5)
+        yield "\n```python\nsecond = 2\n```"
+        raise llm_connection.ServiceUnavailableError("stream interrupted")
+
+    with pytest.raises(llm_connection.ServiceUnavailableError):
+        llm_connection._stream_with_early_extraction(
+            chunks(), extraction_function, False, None
+        )
+    release.set()
+    # the running extraction completes, but the queued one never starts
+    with llm_connection._extraction_lock:
+        assert len(extracted) == 1
+
+
+def test_response_cache_answers_identical_requests(chat_server, monkeypatch):
+    monkeypatch.setattr(
+        llm_connection,
+        "_openai_compatible_api",
+        lambda provider: (_url(chat_server), False),
+    )
+    llm_connection.set_response_cache(MemoryResponseCache())
+    try:
+        for _ in range(3):
+            response = llm_connection.query_llm(
+                [{"role": "user", "content": "Hello"}],
+                "key",
+                "model",
+                AIProviders.DEEPINFRA.value,
+            )
+            assert response == "ok"
+        streamed = llm_connection.stream_llm(
+            [{"role": "user", "content": "Hello"}],
+            "key",
+            "model",
+            AIProviders.DEEPINFRA.value,
+        )
+        assert "".join(streamed) == "ok"
+        llm_connection.query_llm(
+            [{"role": "user", "content": "Hello!"}],
+            "key",
+            "model",
+            AIProviders.DEEPINFRA.value,
+        )
+    finally:
+        llm_connection.set_response_cache(None)
+
+    assert len(chat_server.requests) == 2
+
+
+def test_transport_errors_are_retried(chat_server, monkeypatch):
+    monkeypatch.setattr(
+        llm_connection,
+        "_openai_compatible_api",
+        lambda provider: (_url(chat_server), False),
+    )
+    monkeypatch.setattr(llm_connection, "_retry_policies", {})
+    llm_connection.set_retry_policy(
+        RetryPolicy(base_delay_s=0.01, budget=3), AIProviders.DEEPINFRA.value
+    )
+    conversation = [{"role": "user", "content": "Hello"}]
+
+    # rate limited once, then answered
+    chat_server.respond = lambda request: (
+        (429, {"error": "slow down"}, {"Retry-After": "0"})
+        if len(chat_server.requests) == 1
+        else (200, _chat_completion("ok"), {})
+    )
+    response = llm_connection.query_llm(
+        conversation, "key", "model", AIProviders.DEEPINFRA.value
+    )
+    assert response == "ok"
+    assert len(chat_server.requests) == 2
+
+    # always unavailable: the remaining budget of 2 retries is used up
+    chat_server.respond = lambda request: (503, {"error": "overloaded"}, {})
+    with pytest.raises(llm_connection.ServiceUnavailableError):
+        llm_connection.query_llm(
+            conversation, "key", "model", AIProviders.DEEPINFRA.value
+        )
+    assert len(chat_server.requests) == 5
+
+    # errors that are not retryable are raised right away
+    chat_server.respond = lambda request: (401, {"error": "invalid key"}, {})
+    with pytest.raises(llm_connection.AuthError):
+        llm_connection.query_llm(
+            conversation, "key", "model", AIProviders.DEEPINFRA.value
+        )
+    assert len(chat_server.requests) == 6
+
+    # e.g., an unknown model
+    llm_connection.set_retry_policy(
+        RetryPolicy(base_delay_s=0.01), AIProviders.DEEPINFRA.value
+    )
+    chat_server.respond = lambda request: (404, {"error": "no such model"}, {})
+    with pytest.raises(llm_connection.UnexpectedResponseError):
+        llm_connection.query_llm(
+            conversation, "key", "model", AIProviders.DEEPINFRA.value
+        )
+    assert len(chat_server.requests) == 7
+
+
+def test_sdk_clients_do_not_retry_on_their_own(chat_server, monkeypatch):
+    base_url = f"http://127.0.0.1:{chat_server.server_address[1]}"
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", base_url)
+    monkeypatch.setattr(llm_connection, "_clients", llm_connection.OrderedDict())
+    monkeypatch.setattr(llm_connection, "_retry_policies", {})
+    llm_connection.set_retry_policy(
+        RetryPolicy(max_attempts=2, base_delay_s=0.01), AIProviders.ANTHROPIC.value
+    )
+    chat_server.respond = lambda request: (503, {"error": "overloaded"}, {})
+
+    with pytest.raises(llm_connection.ServiceUnavailableError):
+        llm_connection.query_llm(
+            [{"role": "user", "content": "Hello"}],
+            "key",
+            "model",
+            AIProviders.ANTHROPIC.value,
+        )
+    assert len(chat_server.requests) == 2
+
+
+def test_sdk_errors_are_retryable_only_for_transport_failures():
+    class SDKError(Exception):
+        def __init__(self, status_code):
+            super().__init__(f"status {status_code}")
+            self.status_code = status_code
+
+    assert llm_connection._cohere_error(SDKError(503)).retryable
+    assert not llm_connection._cohere_error(SDKError(404)).retryable
+    assert llm_connection._google_error(ConnectionResetError("reset")).retryable
+    assert not llm_connection._google_error(ValueError("invalid contents")).retryable
+
+
+def test_requests_pass_the_rate_limiter(chat_server, monkeypatch):
+    monkeypatch.setattr(
+        llm_connection,
+        "_openai_compatible_api",
+        lambda provider: (_url(chat_server), False),
+    )
+    monkeypatch.setattr(rate_limiting, "_rate_limits", {})
+    monkeypatch.setattr(rate_limiting, "_limiters", {})
+    rate_limiting.set_rate_limit(
+        AIProviders.DEEPINFRA.value, requests_per_minute=60, tokens_per_minute=6000
+    )
+
+    conversation = [{"role": "user", "content": "x" * 400}]
+    start = time.monotonic()
+    for _ in range(2):
+        llm_connection.query_llm(
+            conversation, "key", "model", AIProviders.DEEPINFRA.value
+        )
+    "".join(
+        llm_connection.stream_llm(
+            conversation, "key", "model", AIProviders.DEEPINFRA.value
+        )
+    )
+    elapsed = time.monotonic() - start
+
+    limiter = rate_limiting.get_rate_limiter(AIProviders.DEEPINFRA.value, "key")
+    # three requests of 101 prompt tokens and 1 response token each, minus the refill
+    assert 3 - elapsed <= 60 - limiter.requests.level <= 3
+    assert 306 - 100 * elapsed <= 6000 - limiter.tokens.level <= 306
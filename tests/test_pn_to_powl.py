@@ -0,0 +1,229 @@
+import json
+import pickle
+from collections import deque
+from copy import deepcopy
+
+import pm4py
+from pm4py import PetriNet
+from pm4py.objects.petri_net.utils import petri_utils as pn_util
+from powl import convert_to_petri_net
+from powl.objects.obj import StrictPartialOrder
+
+from promoai.model_generation.generator import ModelGenerator
+from promoai.pn_to_powl.converter import convert_workflow_net_to_powl
+from promoai.pn_to_powl.converter_utils.compact_net import CompactNet
+from promoai.pn_to_powl.converter_utils.profiling import ConversionProfiler
+from promoai.pn_to_powl.converter_utils.preprocessing import (
+    preprocess,
+    validate_workflow_net,
+)
+from promoai.pn_to_powl.converter_utils.weak_reachability import (
+    get_simplified_reachability_graph,
+)
+from promoai.pn_to_powl.converter_utils.workflow_net_validation import (
+    diagnose_workflow_net,
+)
+
+
+def _example_model():
+    gen = ModelGenerator()
+    a = gen.activity("A")
+    b = gen.activity("B")
+    c = gen.activity("C")
+    d = gen.activity("D")
+    e = gen.activity("E")
+    f = gen.activity("F")
+    choice = gen.xor(b, c)
+    loop = gen.loop(do=d, redo=e)
+    return gen.partial_order(
+        dependencies=[(a, choice), (a, loop), (choice, f), (loop, f)]
+    )
+
+
+def _footprints(powl_model):
+    net, im, fm = convert_to_petri_net(powl_model)
+    return pm4py.discover_footprints(net, im, fm)
+
+
+def test_reachability_matches_bfs():
+    net, im, fm = convert_to_petri_net(_example_model())
+    start_place, end_place = validate_workflow_net(net)
+    compact_net = CompactNet.from_petri_net(net, start_place, end_place)
+    reachability_map = get_simplified_reachability_graph(compact_net)
+    for t in range(compact_net.number_of_transitions):
+        expected = set()
+        queue = deque([t])
+        while queue:
+            transition = queue.popleft()
+            if transition not in expected:
+                expected.add(transition)
+                for p in compact_net.transition_post(transition):
+                    queue.extend(compact_net.place_post(p))
+        assert reachability_map.transitions_of(reachability_map[t]) == expected
+
+
+def test_round_trip_preserves_behavior():
+    model = _example_model()
+    net, im, fm = convert_to_petri_net(model)
+    converted = convert_workflow_net_to_powl(net)
+    assert _footprints(converted) == _footprints(model)
+
+
+def test_preprocess_removes_duplicated_places():
+    net = PetriNet("duplicates")
+    source, p1, p2, p3, sink = (
+        PetriNet.Place(name) for name in ["i", "1", "2", "3", "o"]
+    )
+    a = PetriNet.Transition("a", "A")
+    b = PetriNet.Transition("b", "B")
+    for place in [source, p1, p2, p3, sink]:
+        net.places.add(place)
+    net.transitions.update([a, b])
+    pn_util.add_arc_from_to(source, a, net)
+    for place in [p1, p2, p3]:
+        pn_util.add_arc_from_to(a, place, net)
+        pn_util.add_arc_from_to(place, b, net)
+    pn_util.add_arc_from_to(b, sink, net)
+
+    preprocess(net)
+
+    assert len(net.places) == 3
+    assert len(net.transitions) == 2
+    assert len(pn_util.post_set(a)) == 1
+
+
+def test_parallel_conversion_preserves_behavior():
+    model = _example_model()
+    net, im, fm = convert_to_petri_net(model)
+    converted = convert_workflow_net_to_powl(
+        net, parallel=True, max_workers=2, min_parallel_size=1
+    )
+    assert _footprints(converted) == _footprints(model)
+
+
+def test_workflow_net_diagnostics():
+    net, im, fm = convert_to_petri_net(_example_model())
+    assert diagnose_workflow_net(CompactNet.from_petri_net(net)).is_workflow_net
+
+    # a transition whose output place is a second sink
+    source = next(p for p in net.places if not p.in_arcs)
+    dead_end = PetriNet.Transition("dead_end", "X")
+    extra_sink = PetriNet.Place("extra_sink")
+    net.transitions.add(dead_end)
+    net.places.add(extra_sink)
+    pn_util.add_arc_from_to(source, dead_end, net)
+    pn_util.add_arc_from_to(dead_end, extra_sink, net)
+
+    places = list(net.places)
+    diagnostics = diagnose_workflow_net(CompactNet.from_petri_net(net))
+    assert not diagnostics.is_workflow_net
+    assert extra_sink in [places[p] for p in diagnostics.sink_places]
+    assert len(diagnostics.sink_places) == 2
+
+
+def test_profiler_reports_phases_and_subnets():
+    net, im, fm = convert_to_petri_net(_example_model())
+    profiler = ConversionProfiler()
+    convert_workflow_net_to_powl(net, profiler=profiler)
+
+    report = json.loads(profiler.to_json())
+    for phase in ["validation", "preprocess", "reachability", "mine_xor"]:
+        assert report["phases"][phase]["calls"] >= 1
+    assert report["cuts"]["partial_order"] >= 1
+    assert report["cuts"]["loop"] == 1
+    assert report["max_depth"] >= 1
+    assert report["subnets"][0]["depth"] == 0
+
+
+def test_wide_partial_order_round_trip():
+    gen = ModelGenerator()
+    start = gen.activity("start")
+    end = gen.activity("end")
+    dependencies = [(start, end)]
+    for i in range(60):
+        branch = gen.partial_order(
+            dependencies=[(gen.activity(f"b{i}"), gen.activity(f"c{i}"))]
+        )
+        dependencies += [(start, branch), (branch, end)]
+    model = gen.partial_order(dependencies=dependencies)
+
+    net, im, fm = convert_to_petri_net(model)
+    converted = convert_workflow_net_to_powl(net)
+
+    # the branches are flattened into the top-level partial order
+    nodes = {child.label: child for child in converted.children}
+    assert len(nodes) == 122
+    order = converted.order
+    first, last = nodes["start"], nodes["end"]
+    for i in range(60):
+        b, c = nodes[f"b{i}"], nodes[f"c{i}"]
+        assert order.is_edge(first, b) and order.is_edge(b, c) and order.is_edge(c, last)
+        assert not order.is_edge(b, nodes[f"b{(i + 1) % 60}"])
+    assert order.is_edge(first, last)
+
+
+def _nested_loops_net(depth):
+    # loop(a0, b0 -> loop(a1, b1 -> ... -> c1) -> c0): two POWL levels per loop
+    net = PetriNet("nested_loops")
+
+    def place(name):
+        p = PetriNet.Place(name)
+        net.places.add(p)
+        return p
+
+    def transition(label, source, target):
+        t = PetriNet.Transition(label, label)
+        net.transitions.add(t)
+        pn_util.add_arc_from_to(source, t, net)
+        pn_util.add_arc_from_to(t, target, net)
+
+    start, s = place("i"), place("s0")
+    end, e = place("o"), place("e0")
+    transition("in", start, s)
+    transition("out", e, end)
+    for k in range(depth):
+        transition(f"a{k}", s, e)
+        inner_s, inner_e = place(f"s{k + 1}"), place(f"e{k + 1}")
+        transition(f"b{k}", e, inner_s)
+        transition(f"c{k}", inner_e, s)
+        s, e = inner_s, inner_e
+    transition("last", s, e)
+    return net
+
+
+def _assert_sequence(partial_order):
+    children = partial_order.children
+    order = partial_order.order
+    ranked = sorted(children, key=lambda c: sum(order.is_edge(o, c) for o in children))
+    for i, source in enumerate(ranked):
+        for j, target in enumerate(ranked):
+            assert order.is_edge(source, target) == (i < j)
+
+
+def test_deeply_nested_net():
+    model = convert_workflow_net_to_powl(_nested_loops_net(300))
+
+    # walk the model without recursion
+    labels = set()
+    partial_orders = []
+    max_depth = 0
+    stack = [(model, 0)]
+    while stack:
+        node, depth = stack.pop()
+        max_depth = max(max_depth, depth)
+        if node.label is not None:
+            labels.add(node.label)
+        if isinstance(node, StrictPartialOrder):
+            partial_orders.append(node)
+        stack.extend((child, depth + 1) for child in node.children)
+    assert len(labels) == 3 * 300 + 3
+    assert max_depth > 600
+    assert len(partial_orders) == 301
+    # the outermost partial order has the most deeply nested children
+    _assert_sequence(partial_orders[0])
+    _assert_sequence(partial_orders[-1])
+
+    # the partial orders survive copying and pickling
+    small = convert_workflow_net_to_powl(_nested_loops_net(3))
+    for copied in [deepcopy(small), pickle.loads(pickle.dumps(small))]:
+        _assert_sequence(copied)
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+from promoai.general_utils import rate_limiting
+from promoai.general_utils.rate_limiting import (
+    _TokenBucket,
+    get_rate_limiter,
+    RateLimiter,
+    set_rate_limit,
+)
+
+
+def test_token_bucket_reservations():
+    bucket = _TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0
+    # one token per second is refilled
+    assert 0.9 < bucket.reserve(1) <= 1
+    assert 1.9 < bucket.reserve(1) <= 2
+    bucket.consume(10)
+    assert 12.9 < bucket.reserve(1) <= 13
+
+
+def test_concurrency_is_shared_by_threads_and_tasks():
+    limiter = RateLimiter(max_concurrency=2)
+    in_flight = [0]
+    peak = [0]
+    lock = threading.Lock()
+
+    def enter():
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+
+    def leave():
+        with lock:
+            in_flight[0] -= 1
+
+    def request_in_thread():
+        with limiter.slot(10):
+            enter()
+            time.sleep(0.05)
+            leave()
+
+    async def request_in_task():
+        async with limiter.aslot(10):
+            enter()
+            await asyncio.sleep(0.05)
+            leave()
+
+    async def run_tasks():
+        tasks = [asyncio.create_task(request_in_task()) for _ in range(6)]
+        # a cancelled waiter must not keep its slot
+        await asyncio.sleep(0.01)
+        tasks[-1].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    threads = [threading.Thread(target=request_in_thread) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(run_tasks())
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 2
+    assert in_flight[0] == 0
+    assert limiter.concurrency.available == 2
+
+
+def test_limiters_per_provider_and_key(monkeypatch):
+    monkeypatch.setattr(rate_limiting, "_rate_limits", {})
+    monkeypatch.setattr(rate_limiting, "_limiters", {})
+    assert get_rate_limiter("OpenAI", "key") is None
+
+    set_rate_limit("OpenAI", requests_per_minute=100, max_concurrency=4)
+    limiter = get_rate_limiter("OpenAI", "key")
+    assert limiter is get_rate_limiter("OpenAI", "key")
+    assert limiter is not get_rate_limiter("OpenAI", "other key")
+    assert limiter.tokens is None
+    assert get_rate_limiter("Google", "key") is None
+
+    set_rate_limit("OpenAI")
+    assert get_rate_limiter("OpenAI", "key") is None
@@ -0,0 +1,71 @@
+import pytest
+
+from promoai.general_utils import response_cache
+from promoai.general_utils.response_cache import (
+    MemoryResponseCache,
+    request_key,
+    ResponseCache,
+    SQLiteResponseCache,
+)
+
+
+def _caches(tmp_path, **kwargs):
+    return [
+        MemoryResponseCache(**kwargs),
+        SQLiteResponseCache(str(tmp_path / "responses.sqlite"), **kwargs),
+    ]
+
+
+def test_request_key_is_stable():
+    conversation = [{"role": "user", "content": "Model the process."}]
+    key = request_key(conversation, "model", "OpenAI", {"temperature": 0, "seed": 1})
+    assert key == request_key(
+        [dict(conversation[0])], "model", "OpenAI", {"seed": 1, "temperature": 0}
+    )
+    assert key != request_key(conversation, "model", "OpenAI", {"temperature": 0})
+    assert key != request_key(conversation, "other", "OpenAI", {"temperature": 0})
+
+
+@pytest.mark.parametrize("index", [0, 1])
+def test_lru_eviction_and_ttl(tmp_path, monkeypatch, index):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    cache = _caches(tmp_path, max_entries=2, ttl_s=60)[index]
+
+    cache.put("a", "response a")
+    cache.put("b", "response b")
+    now[0] += 1
+    assert cache.get("a") == "response a"
+    cache.put("c", "response c")
+    # 'b' is the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") == "response a"
+
+    now[0] += 60
+    assert cache.get("a") is None
+    assert cache.get("c") == "response c"
+    now[0] += 1
+    assert cache.get("c") is None
+
+
+def test_sqlite_cache_is_persistent(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    cache = SQLiteResponseCache(path)
+    cache.put("a", "response a")
+    cache.close()
+    assert SQLiteResponseCache(path).get("a") == "response a"
+
+
+def test_sampled_requests_bypass_the_cache_by_default(tmp_path):
+    for cache in _caches(tmp_path):
+        assert cache.accepts(None)
+        assert cache.accepts({"temperature": 0, "seed": 1})
+        assert not cache.accepts({"temperature": 0.7})
+        assert not cache.accepts({"top_p": 0.9})
+    for cache in _caches(tmp_path, cache_sampled=True):
+        assert cache.accepts({"temperature": 0.7})
+
+
+def test_response_cache_is_abstract():
+    with pytest.raises(TypeError):
+        ResponseCache(max_entries=1)
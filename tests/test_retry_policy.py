@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from promoai.general_utils.retry_policy import parse_retry_after, RetryPolicy
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(" 0.5 ") == 0.5
+    date = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(date, usegmt=True)) <= 30
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_and_budget():
+    policy = RetryPolicy(
+        max_attempts=4, base_delay_s=1, max_delay_s=3, jitter=0.5, budget=2
+    )
+    assert 0.5 <= policy.backoff(1) <= 1
+    assert 1 <= policy.backoff(2) <= 2
+    assert 1.5 <= policy.backoff(3) <= 3
+    assert policy.backoff(4) is None
+    assert 2 <= policy.backoff(1, retry_after=2) <= 2.5
+    assert policy.backoff(1, retry_after=10) is None
+
+    assert policy.consume_budget("OpenAI")
+    assert policy.consume_budget("OpenAI")
+    assert not policy.consume_budget("OpenAI")
+    assert policy.consume_budget("Google")